@@ -0,0 +1,127 @@
+import os
+import json
+from typing import List
+import numpy as np
+
+# Number of set bits in every possible byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+class BinaryIndex:
+    """Sign-bit quantized embeddings scanned by Hamming distance."""
+
+    # Hamming ranking is coarse, so callers should rerank a wider shortlist
+    approximate = True
+
+    def __init__(self, index_dir: str):
+        """
+        Initialize the binary index.
+
+        Args:
+            index_dir: Directory holding the packed codes, their chunk ids and the code width
+        """
+        self.codes_file = os.path.join(index_dir, "binary_codes.u8")
+        self.ids_file = os.path.join(index_dir, "binary_ids.jsonl")
+        self.meta_file = os.path.join(index_dir, "binary_meta.json")
+        self.codes = None
+        self.ids = []
+        self.code_bytes = None
+        self._load()
+
+    def _load(self):
+        """Load the codes and ids from disk."""
+        if not os.path.exists(self.meta_file):
+            return
+        try:
+            with open(self.meta_file, 'r') as f:
+                self.code_bytes = json.load(f)["code_bytes"]
+            ids = []
+            if os.path.exists(self.ids_file):
+                with open(self.ids_file, 'r') as f:
+                    ids = [json.loads(line) for line in f if line.strip()]
+            codes = np.fromfile(self.codes_file, dtype=np.uint8) if os.path.exists(self.codes_file) \
+                else np.empty(0, dtype=np.uint8)
+            # A partially written append leaves extra codes; drop them so the
+            # next append lines up with the ids again
+            self.ids = ids[:len(codes) // self.code_bytes]
+            self.codes = codes[:len(self.ids) * self.code_bytes].reshape(-1, self.code_bytes)
+            if len(codes) > self.codes.size:
+                os.truncate(self.codes_file, self.codes.size)
+        except Exception as e:
+            # Appending to files we can't read would leave codes and ids misaligned
+            print(f"Error loading binary index, discarding it: {e}")
+            self.clear()
+
+    @staticmethod
+    def pack(embeddings: np.ndarray) -> np.ndarray:
+        """Pack the sign of each dimension into bits (384 dims -> 48 bytes)."""
+        return np.packbits(np.asarray(embeddings) > 0, axis=-1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[str], embeddings: np.ndarray) -> None:
+        """
+        Append embeddings to the index.
+
+        Args:
+            ids: Chunk id of each embedding
+            embeddings: Embeddings to quantize, one row per id
+        """
+        codes = self.pack(embeddings)
+        # Sizes to roll the files back to if the append fails part way
+        sizes = [os.path.getsize(path) if os.path.exists(path) else 0
+                 for path in (self.codes_file, self.ids_file)]
+        try:
+            if self.code_bytes is None:
+                self.code_bytes = codes.shape[1]
+                with open(self.meta_file, 'w') as f:
+                    json.dump({"code_bytes": self.code_bytes}, f)
+            # Codes go first so a crash never leaves ids without codes
+            with open(self.codes_file, 'ab') as f:
+                f.write(codes.tobytes())
+            with open(self.ids_file, 'a') as f:
+                f.writelines(json.dumps(chunk_id) + "\n" for chunk_id in ids)
+            self.codes = codes if self.codes is None else np.concatenate([self.codes, codes])
+            self.ids.extend(ids)
+        except Exception as e:
+            print(f"Error saving binary index: {e}")
+            # Leave disk matching memory, otherwise the next append's codes
+            # and ids would no longer line up
+            for path, size in zip((self.codes_file, self.ids_file), sizes):
+                try:
+                    if os.path.exists(path):
+                        os.truncate(path, size)
+                except OSError as err:
+                    print(f"Error rolling back {path}: {err}")
+
+    def save(self) -> None:
+        """Nothing to do: add() appends codes and ids to disk as it goes."""
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[str]:
+        """
+        Shortlist the chunks closest to a query by Hamming distance.
+
+        Args:
+            query_embedding: Query embedding
+            k: Number of candidates to return
+
+        Returns:
+            Chunk ids of the k nearest codes, nearest first
+        """
+        if not self.ids:
+            return []
+        distances = _POPCOUNT[np.bitwise_xor(self.codes, self.pack(query_embedding))].sum(axis=1, dtype=np.int32)
+
+        k = min(k, len(self.ids))
+        candidates = np.argpartition(distances, k - 1)[:k]
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [self.ids[i] for i in candidates]
+
+    def clear(self) -> None:
+        """Remove all codes from the index."""
+        self.codes = None
+        self.ids = []
+        self.code_bytes = None
+        for path in (self.codes_file, self.ids_file, self.meta_file):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,196 @@
+import queue
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+class ChatbotMixin:
+    """
+    Vector store setup and response generation shared by the chatbots.
+
+    Classes using this mixin provide transcript_loader, vector_store,
+    client, model, max_tokens and system_prompt attributes.
+    """
+
+    def setup_vector_store(self, force_rebuild: bool = False, progress: Optional[queue.Queue] = None,
+                           transcripts_per_batch: int = 8) -> None:
+        """
+        Set up the vector store with transcript data.
+
+        Transcripts are added in small batches as they are read, so later
+        files load from disk while earlier ones are being encoded. Whether
+        to encode on a worker pool is decided once from the size of the
+        whole corpus, and the pool is shared by every batch.
+
+        Args:
+            force_rebuild: If True, clear existing data and rebuild
+            progress: Optional queue that receives progress messages
+            transcripts_per_batch: Number of transcripts encoded together
+        """
+        if not self._needs_setup(force_rebuild, progress):
+            return
+
+        # Stream transcripts from disk into the vector store
+        added = 0
+        with self.vector_store.encoding_pool(self.transcript_loader.get_total_size()) as pool:
+            for batch in self._iter_transcript_batches(transcripts_per_batch):
+                self._add_transcripts(batch, pool)
+                added += len(batch)
+                self._report(progress, f"Indexed {added} transcripts")
+
+        self._finish_setup(added, progress)
+
+    def _needs_setup(self, force_rebuild: bool, progress: Optional[queue.Queue]) -> bool:
+        """Clear the vector store if rebuilding, and check whether it needs to be filled."""
+        if force_rebuild:
+            self.vector_store.clear_collection()
+
+        # Check if vector store already has data
+        collection_info = self.vector_store.get_collection_info()
+        if collection_info["total_chunks"] > 0 and not force_rebuild:
+            self._report(progress, f"Vector store already contains {collection_info['total_chunks']} chunks")
+            return False
+        return True
+
+    def _iter_transcript_batches(self, transcripts_per_batch: int) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream transcripts from disk in batches.
+
+        Yields:
+            Lists of up to transcripts_per_batch transcript dictionaries
+        """
+        batch = []
+        for transcript in self.transcript_loader.iter_transcripts():
+            batch.append(transcript)
+            if len(batch) == transcripts_per_batch:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def _add_transcripts(self, transcripts: List[Dict[str, Any]], pool=None) -> None:
+        """
+        Add a batch of transcripts to the vector store.
+
+        Args:
+            transcripts: List of transcript dictionaries
+            pool: Encoding pool from the vector store's encoding_pool()
+        """
+        self.vector_store.add_transcripts(transcripts, pool=pool)
+
+    def _finish_setup(self, added: int, progress: Optional[queue.Queue]) -> None:
+        """Persist what the vector store only holds in memory, and report the end of a setup run."""
+        # Indexes that are only updated in memory by adds are written here, once per ingest
+        self.vector_store.close()
+        if not added:
+            self._report(progress, "No transcripts found to add to vector store")
+
+    # Guards starting setup threads; held only while checking and starting one
+    _setup_lock = threading.Lock()
+
+    def start_setup(self, force_rebuild: bool = False) -> Tuple[threading.Thread, queue.Queue]:
+        """
+        Set up the vector store on a background thread.
+
+        Only one setup runs per chatbot at a time. The chatbot is shared
+        across Streamlit reruns, so if a setup is still running, its thread
+        and progress queue are returned instead of starting another one
+        that could clear the store underneath it.
+
+        Args:
+            force_rebuild: If True, clear existing data and rebuild
+
+        Returns:
+            The running setup thread and the queue it posts progress messages to
+        """
+        with self._setup_lock:
+            running = getattr(self, "_setup", None)
+            if running is not None and running[0].is_alive():
+                self._report(running[1], "Setup is already running; following its progress")
+                return running
+
+            progress = queue.Queue()
+
+            def run():
+                try:
+                    self.setup_vector_store(force_rebuild=force_rebuild, progress=progress)
+                except Exception as e:
+                    self._report(progress, f"Error setting up vector store: {str(e)}")
+
+            thread = threading.Thread(target=run, daemon=True)
+            thread.start()
+            self._setup = (thread, progress)
+            return self._setup
+
+    @staticmethod
+    def _report(progress: Optional[queue.Queue], message: str) -> None:
+        """Post a setup progress message to the progress queue, or print it if there is none."""
+        if progress is not None:
+            progress.put(message)
+        else:
+            print(message)
+
+    def _completion_request(self, query: str, context: str) -> Dict[str, Any]:
+        """
+        Build the chat completion arguments for a query.
+
+        Args:
+            query: User query
+            context: Relevant context from transcripts
+
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": f"Context from Stanford ETL transcripts:\n\n{context}\n\nQuestion: {query}\n\nPlease answer based on the provided context."}
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": 0.7
+        }
+
+    def generate_response(self, query: str, context: str) -> str:
+        """
+        Generate a response using OpenAI API.
+
+        Args:
+            query: User query
+            context: Relevant context from transcripts
+
+        Returns:
+            Generated response
+        """
+        try:
+            response = self.client.chat.completions.create(
+                **self._completion_request(query, context)
+            )
+
+            return response.choices[0].message.content
+
+        except Exception as e:
+            return f"Error generating response: {str(e)}"
+
+    def generate_response_stream(self, query: str, context: str) -> Iterator[str]:
+        """
+        Generate a response using OpenAI API, yielding text as it arrives.
+
+        Args:
+            query: User query
+            context: Relevant context from transcripts
+
+        Yields:
+            Response text deltas
+        """
+        try:
+            stream = self.client.chat.completions.create(
+                **self._completion_request(query, context),
+                stream=True
+            )
+
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            yield f"Error generating response: {str(e)}"
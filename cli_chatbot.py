@@ -5,9 +5,16 @@ Command-line interface for the Stanford ETL RAG Chatbot.
 
 import os
 import sys
+import queue
 from rag_chatbot import RAGChatbot
 from dotenv import load_dotenv
 
+# readline isn't available on every platform; tab completion is optional
+try:
+    import readline
+except ImportError:
+    readline = None
+
 # Load environment variables
 load_dotenv()
 
@@ -73,6 +80,67 @@ def search_transcripts(chatbot):
     except Exception as e:
         print(f"Error searching: {str(e)}")
 
+def run_setup(chatbot, force_rebuild=False):
+    """Run vector store setup on a background thread, printing its progress."""
+    thread, progress = chatbot.start_setup(force_rebuild=force_rebuild)
+    while thread.is_alive() or not progress.empty():
+        try:
+            print(f"  {progress.get(timeout=0.5)}")
+        except queue.Empty:
+            pass
+
+def setup_vector_store(chatbot):
+    """Set up the vector store."""
+    print("🔄 Setting up vector store...")
+    run_setup(chatbot)
+    print("✅ Vector store setup complete!")
+    print_stats(chatbot)
+
+def rebuild_vector_store(chatbot):
+    """Rebuild the vector store after confirmation."""
+    confirm = input("⚠️  This will clear all existing data. Continue? (y/N): ")
+    if confirm.lower() == 'y':
+        print("🔄 Rebuilding vector store...")
+        run_setup(chatbot, force_rebuild=True)
+        print("✅ Vector store rebuilt!")
+        print_stats(chatbot)
+    else:
+        print("Rebuild cancelled.")
+
+def clear_screen():
+    """Clear the screen and reprint the banner."""
+    os.system('clear' if os.name == 'posix' else 'cls')
+    print_banner()
+
+def quit_chat():
+    """Say goodbye and signal the chat loop to exit."""
+    print("👋 Goodbye!")
+    return True
+
+def build_commands(chatbot):
+    """Map each slash command to its handler. A handler returning True exits."""
+    return {
+        "/help": print_help,
+        "/stats": lambda: print_stats(chatbot),
+        "/setup": lambda: setup_vector_store(chatbot),
+        "/rebuild": lambda: rebuild_vector_store(chatbot),
+        "/search": lambda: search_transcripts(chatbot),
+        "/quit": quit_chat,
+        "/clear": clear_screen,
+    }
+
+def enable_tab_completion(commands):
+    """Complete slash commands with the tab key."""
+    if readline is None:
+        return
+    
+    def complete(text, state):
+        matches = [command for command in commands if command.startswith(text)]
+        return matches[state] if state < len(matches) else None
+    
+    readline.set_completer(complete)
+    readline.parse_and_bind("tab: complete")
+
 def main():
     """Main CLI function."""
     print_banner()
@@ -102,6 +170,9 @@ def main():
     # Show initial statistics
     print_stats(chatbot)
     
+    commands = build_commands(chatbot)
+    enable_tab_completion(commands)
+    
     # Main chat loop
     print("💬 Start chatting! Type /help for available commands.")
     print()
@@ -116,46 +187,24 @@ def main():
             
             # Handle commands
             if user_input.startswith("/"):
-                command = user_input.lower()
+                handler = commands.get(user_input.lower())
                 
-                if command == "/help":
-                    print_help()
-                elif command == "/stats":
-                    print_stats(chatbot)
-                elif command == "/setup":
-                    print("🔄 Setting up vector store...")
-                    chatbot.setup_vector_store()
-                    print("✅ Vector store setup complete!")
-                    print_stats(chatbot)
-                elif command == "/rebuild":
-                    confirm = input("⚠️  This will clear all existing data. Continue? (y/N): ")
-                    if confirm.lower() == 'y':
-                        print("🔄 Rebuilding vector store...")
-                        chatbot.setup_vector_store(force_rebuild=True)
-                        print("✅ Vector store rebuilt!")
-                        print_stats(chatbot)
-                    else:
-                        print("Rebuild cancelled.")
-                elif command == "/search":
-                    search_transcripts(chatbot)
-                elif command == "/quit":
-                    print("👋 Goodbye!")
-                    break
-                elif command == "/clear":
-                    os.system('clear' if os.name == 'posix' else 'cls')
-                    print_banner()
-                else:
+                if handler is None:
                     print(f"❌ Unknown command: {user_input}")
                     print("Type /help for available commands.")
+                elif handler():
+                    break
                 
                 continue
             
-            # Generate response
+            # Generate response, printing it as it streams in
             print("🤖 Thinking...")
-            response = chatbot.chat(user_input)
+            response = chatbot.chat_stream(user_input)
             
-            print(f"\n🤖 Assistant: {response['response']}")
-            print()
+            print("\n🤖 Assistant: ", end="", flush=True)
+            for delta in response['response']:
+                print(delta, end="", flush=True)
+            print("\n")
             
             # Optionally show context
             show_context = input("Show context used? (y/N): ").strip().lower()
@@ -0,0 +1,3 @@
+# test_chatbot.py is an interactive smoke test that needs an OpenAI key and a
+# local transcripts folder, so pytest only collects the unit tests
+collect_ignore = ["test_chatbot.py"]
@@ -0,0 +1,79 @@
+from typing import List, Dict, Any, Set, Tuple
+import tiktoken
+
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Get the tiktoken encoding for a model.
+    
+    Args:
+        model: OpenAI model name
+        
+    Returns:
+        The model's encoding, or cl100k_base for models tiktoken doesn't know
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    """Word n-gram shingles of a text."""
+    words = text.lower().split()
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _jaccard(a: Set[Tuple[str, ...]], b: Set[Tuple[str, ...]]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    union = len(a | b)
+    return len(a & b) / union if union else 1.0
+
+def dedupe_results(results: List[Dict[str, Any]], n_results: int,
+                   threshold: float = 0.7) -> List[Dict[str, Any]]:
+    """
+    Drop near-duplicate search results.
+    
+    Results are taken in ranked order and kept only if their word-trigram
+    Jaccard similarity to every result already kept is below the threshold.
+    
+    Args:
+        results: Ranked search results with a 'content' key
+        n_results: Maximum number of results to keep
+        threshold: Jaccard similarity at which a result counts as a duplicate
+        
+    Returns:
+        Up to n_results distinct results, in ranked order
+    """
+    kept = []
+    kept_shingles = []
+    for result in results:
+        shingles = _shingles(result['content'])
+        if any(_jaccard(shingles, other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(result)
+        kept_shingles.append(shingles)
+        if len(kept) == n_results:
+            break
+    return kept
+
+def fit_to_token_budget(parts: List[str], budget: int, encoding: tiktoken.Encoding) -> List[str]:
+    """
+    Keep leading parts while their combined token count fits the budget.
+    
+    Args:
+        parts: Text parts in priority order
+        budget: Maximum total tokens
+        encoding: Tokenizer used to count tokens
+        
+    Returns:
+        The longest prefix of parts that fits
+    """
+    kept = []
+    used = 0
+    for part in parts:
+        tokens = len(encoding.encode(part))
+        if used + tokens > budget:
+            break
+        kept.append(part)
+        used += tokens
+    return kept
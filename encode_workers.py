@@ -0,0 +1,35 @@
+import os
+from typing import List, Callable
+import torch
+import numpy as np
+
+# Per-process model used by the vector stores' parallel encoding workers
+_worker_model = None
+
+def worker_count() -> int:
+    """
+    Number of encoding worker processes to start.
+
+    One per physical core: os.cpu_count() includes SMT siblings, and two
+    single-threaded workers on one core only contend for its FMA units.
+    """
+    return max(1, (os.cpu_count() or 2) // 2)
+
+def init_encode_worker(load_model: Callable, *args) -> None:
+    """
+    Load the embedding model once in each worker process.
+
+    Args:
+        load_model: Picklable callable returning an object with a
+            SentenceTransformer-style encode() method
+        *args: Arguments passed to load_model
+    """
+    global _worker_model
+    # Each worker gets one core; parallelism comes from the process pool
+    torch.set_num_threads(1)
+    _worker_model = load_model(*args)
+
+def encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode one shard of texts in a worker process."""
+    return _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                normalize_embeddings=True)
@@ -0,0 +1,220 @@
+import os
+import json
+import math
+from typing import List, Optional
+import numpy as np
+import faiss
+
+class FaissIndex:
+    """OPQ + IVF-PQ compressed FAISS index over normalized embeddings."""
+
+    # PQ codes only approximate the embeddings, so callers should rerank
+    approximate = True
+
+    def __init__(self, index_dir: str, n_lists: Optional[int] = None, n_subquantizers: int = 48,
+                 n_probe: int = 16, min_train_size: int = 10000):
+        """
+        Initialize the FAISS index.
+
+        Args:
+            index_dir: Directory holding the trained index with its chunk ids, or
+                the pending embeddings and their ids, and the embedding width
+            n_lists: Number of IVF clusters; by default about 4 * sqrt(N) for
+                the N embeddings the index is trained on
+            n_subquantizers: PQ code size in bytes per embedding
+            n_probe: Number of clusters visited per query
+            min_train_size: Number of embeddings to collect before training
+        """
+        # The trained index and its chunk ids share one file so they are
+        # always replaced together
+        self.index_file = os.path.join(index_dir, "faiss_opq.npz")
+        self.pending_file = os.path.join(index_dir, "faiss_pending.f32")
+        self.ids_file = os.path.join(index_dir, "faiss_ids.jsonl")
+        self.meta_file = os.path.join(index_dir, "faiss_meta.json")
+        self.n_lists = n_lists
+        self.n_subquantizers = n_subquantizers
+        self.n_probe = n_probe
+
+        # Training IVF centroids and PQ codebooks needs enough samples per
+        # cluster (FAISS asks for 39); until then embeddings are kept raw and
+        # scanned exactly. 10k also covers the 256 PQ centroids per subquantizer
+        self.min_train_size = max(min_train_size, 39 * n_lists) if n_lists else min_train_size
+
+        self.index = None
+        self.pending = None
+        self.ids = []
+        self.dim = None
+        self._index_dirty = False
+        self._load()
+
+    def _load(self):
+        """Load the embedding width, the index or pending embeddings, and the chunk ids."""
+        if not os.path.exists(self.meta_file):
+            return
+        try:
+            with open(self.meta_file, 'r') as f:
+                self.dim = json.load(f)["dim"]
+
+            if os.path.exists(self.index_file):
+                with np.load(self.index_file) as data:
+                    self.index = faiss.deserialize_index(data["index"])
+                    self.ids = data["ids"].tolist()
+                faiss.extract_index_ivf(self.index).nprobe = self.n_probe
+                if len(self.ids) != self.index.ntotal:
+                    raise ValueError(f"{len(self.ids)} ids for {self.index.ntotal} indexed embeddings")
+                # Left behind if the process stopped right after training
+                self._remove_pending()
+            else:
+                ids = []
+                if os.path.exists(self.ids_file):
+                    with open(self.ids_file, 'r') as f:
+                        ids = [json.loads(line) for line in f if line.strip()]
+                pending = np.fromfile(self.pending_file, dtype=np.float32) if os.path.exists(self.pending_file) \
+                    else np.empty(0, dtype=np.float32)
+                # A partially written append leaves extra rows; drop them so the
+                # next append lines up with the ids again
+                self.ids = ids[:len(pending) // self.dim]
+                self.pending = pending[:len(self.ids) * self.dim].reshape(-1, self.dim)
+                if len(pending) > self.pending.size:
+                    os.truncate(self.pending_file, self.pending.nbytes)
+        except Exception as e:
+            # Appending to files we can't read would leave rows and ids misaligned
+            print(f"Error loading FAISS index, discarding it: {e}")
+            self.clear()
+
+    def _train(self):
+        """Train the OPQ rotation, IVF centroids and PQ codebooks on the pending embeddings."""
+        n_train = len(self.pending)
+        n_lists = self.n_lists or max(1, min(4 * math.isqrt(n_train), n_train // 39))
+        print(f"Training FAISS index with {n_lists} lists on {n_train} embeddings...")
+        index = faiss.index_factory(
+            self.dim, f"OPQ{self.n_subquantizers},IVF{n_lists},PQ{self.n_subquantizers}",
+            faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(self.pending)
+        index.add(self.pending)
+        faiss.extract_index_ivf(index).nprobe = self.n_probe
+
+        self.index = index
+        self.pending = None
+        self._index_dirty = True
+        self.save()
+
+    def save(self) -> None:
+        """
+        Write the trained index and its chunk ids if embeddings were added since the last save.
+
+        Adds after training only update the index in memory, so the file is
+        written once per ingest here rather than on every add() call. The new
+        file is written beside the old one and then renamed over it, so a
+        crash leaves either the old index or the new one, never a mix.
+        """
+        if self.index is None or not self._index_dirty:
+            return
+        temp_file = self.index_file + ".tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                np.savez(f, index=faiss.serialize_index(self.index), ids=np.array(self.ids))
+            os.replace(temp_file, self.index_file)
+            self._index_dirty = False
+        except Exception as e:
+            print(f"Error saving FAISS index: {e}")
+            return
+        # The pending embeddings and their ids are in the index file now
+        self._remove_pending()
+
+    def _remove_pending(self) -> None:
+        """Delete the untrained embeddings and their ids from disk."""
+        for path in (self.pending_file, self.ids_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[str], embeddings: np.ndarray) -> None:
+        """
+        Add embeddings to the index.
+
+        Args:
+            ids: Chunk id of each embedding
+            embeddings: Normalized embeddings, one row per id
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if self.index is not None:
+            # Written to disk by save()
+            self.index.add(embeddings)
+            self.ids.extend(ids)
+            self._index_dirty = True
+            return
+
+        # Sizes to roll the files back to if the append fails part way
+        sizes = [os.path.getsize(path) if os.path.exists(path) else 0
+                 for path in (self.pending_file, self.ids_file)]
+        try:
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                with open(self.meta_file, 'w') as f:
+                    json.dump({"dim": self.dim}, f)
+            # Rows go first so a crash never leaves ids without rows
+            with open(self.pending_file, 'ab') as f:
+                f.write(embeddings.tobytes())
+            with open(self.ids_file, 'a') as f:
+                f.writelines(json.dumps(chunk_id) + "\n" for chunk_id in ids)
+            self.pending = embeddings if self.pending is None else np.vstack([self.pending, embeddings])
+            self.ids.extend(ids)
+        except Exception as e:
+            print(f"Error saving FAISS index: {e}")
+            # Leave disk matching memory, otherwise the next append's rows
+            # and ids would no longer line up
+            for path, size in zip((self.pending_file, self.ids_file), sizes):
+                try:
+                    if os.path.exists(path):
+                        os.truncate(path, size)
+                except OSError as err:
+                    print(f"Error rolling back {path}: {err}")
+            return
+
+        if len(self.pending) >= self.min_train_size:
+            try:
+                self._train()
+            except Exception as e:
+                # The pending embeddings are intact, so training is retried on the next add
+                print(f"Error training FAISS index: {e}")
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[str]:
+        """
+        Find the chunks with the highest approximate inner product with a query.
+
+        Args:
+            query_embedding: Normalized query embedding
+            k: Number of results to return
+
+        Returns:
+            Chunk ids of the k best matches, best first
+        """
+        if not self.ids:
+            return []
+        k = min(k, len(self.ids))
+        query = np.asarray(query_embedding, dtype=np.float32)
+
+        if self.index is None:
+            scores = self.pending @ query
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+        else:
+            _, labels = self.index.search(query[np.newaxis, :], k)
+            best = labels[0][labels[0] >= 0]
+
+        return [self.ids[i] for i in best]
+
+    def clear(self) -> None:
+        """Remove all embeddings from the index."""
+        self.index = None
+        self.pending = None
+        self.ids = []
+        self.dim = None
+        self._index_dirty = False
+        for path in (self.index_file, self.pending_file, self.ids_file, self.meta_file):
+            if os.path.exists(path):
+                os.remove(path)
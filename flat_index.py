@@ -0,0 +1,125 @@
+import os
+import json
+from typing import List
+import numpy as np
+
+class FlatIndex:
+    """Float16 embeddings in a memory-mapped file, scanned exhaustively."""
+
+    # The scan is exhaustive, so results only need reranking for exact scores
+    approximate = False
+
+    def __init__(self, index_dir: str, block_size: int = 65536):
+        """
+        Initialize the flat index.
+
+        Args:
+            index_dir: Directory holding the embeddings file, chunk ids and embedding width
+            block_size: Rows scored per block during a scan
+        """
+        self.embeddings_file = os.path.join(index_dir, "flat_embeddings.f16")
+        self.ids_file = os.path.join(index_dir, "flat_ids.jsonl")
+        self.meta_file = os.path.join(index_dir, "flat_meta.json")
+        self.block_size = block_size
+        self.ids = []
+        self.dim = None
+        self._load()
+
+    def _load(self):
+        """Load the embedding width and the chunk ids of every complete row."""
+        if not os.path.exists(self.meta_file):
+            return
+        try:
+            with open(self.meta_file, 'r') as f:
+                self.dim = json.load(f)["dim"]
+            ids = []
+            if os.path.exists(self.ids_file):
+                with open(self.ids_file, 'r') as f:
+                    ids = [json.loads(line) for line in f if line.strip()]
+            n_values = os.path.getsize(self.embeddings_file) // 2 if os.path.exists(self.embeddings_file) else 0
+            # A partially written append leaves extra rows; drop them so the
+            # next append lines up with the ids again
+            self.ids = ids[:n_values // self.dim]
+            if n_values > len(self.ids) * self.dim:
+                os.truncate(self.embeddings_file, len(self.ids) * self.dim * 2)
+        except Exception as e:
+            # Appending to files we can't read would leave rows and ids misaligned
+            print(f"Error loading flat index, discarding it: {e}")
+            self.clear()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[str], embeddings: np.ndarray) -> None:
+        """
+        Append embeddings to the index.
+
+        Args:
+            ids: Chunk id of each embedding
+            embeddings: Normalized embeddings, one row per id
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float16)
+        # Sizes to roll the files back to if the append fails part way
+        sizes = [os.path.getsize(path) if os.path.exists(path) else 0
+                 for path in (self.embeddings_file, self.ids_file)]
+        try:
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                with open(self.meta_file, 'w') as f:
+                    json.dump({"dim": self.dim}, f)
+            # Embeddings go first so a crash never leaves ids without rows
+            with open(self.embeddings_file, 'ab') as f:
+                f.write(embeddings.tobytes())
+            with open(self.ids_file, 'a') as f:
+                f.writelines(json.dumps(chunk_id) + "\n" for chunk_id in ids)
+            self.ids.extend(ids)
+        except Exception as e:
+            print(f"Error saving flat index: {e}")
+            # Leave disk matching memory, otherwise the next append's embeddings
+            # and ids would no longer line up
+            for path, size in zip((self.embeddings_file, self.ids_file), sizes):
+                try:
+                    if os.path.exists(path):
+                        os.truncate(path, size)
+                except OSError as err:
+                    print(f"Error rolling back {path}: {err}")
+
+    def save(self) -> None:
+        """Nothing to do: add() appends rows and ids to disk as it goes."""
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[str]:
+        """
+        Find the chunks with the highest inner product with a query.
+
+        Args:
+            query_embedding: Normalized query embedding
+            k: Number of results to return
+
+        Returns:
+            Chunk ids of the k best matches, best first
+        """
+        if not self.ids:
+            return []
+        embeddings = np.memmap(self.embeddings_file, dtype=np.float16, mode='r',
+                               shape=(len(self.ids), self.dim))
+        query = np.asarray(query_embedding, dtype=np.float32)
+
+        # NumPy has no float16 BLAS kernels, so widen one block at a time to
+        # float32 and score it with a single GEMV
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), self.block_size):
+            block = embeddings[start:start + self.block_size]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+
+        k = min(k, len(self.ids))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [self.ids[i] for i in best]
+
+    def clear(self) -> None:
+        """Remove all embeddings from the index."""
+        self.ids = []
+        self.dim = None
+        for path in (self.embeddings_file, self.ids_file, self.meta_file):
+            if os.path.exists(path):
+                os.remove(path)
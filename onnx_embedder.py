@@ -0,0 +1,129 @@
+import os
+import sys
+from typing import List, Optional, Union
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+MODEL_FILE = "model_int8.onnx"
+
+class OnnxEmbedder:
+    """Sentence embedder backed by an int8-quantized ONNX Runtime session."""
+
+    def __init__(self, model_dir: str, max_length: int = 256,
+                 intra_op_num_threads: Optional[int] = None):
+        """
+        Initialize the embedder.
+
+        Args:
+            model_dir: Directory written by export_quantized_model
+            max_length: Maximum tokens per text, matching the SentenceTransformer model
+            intra_op_num_threads: Threads per inference call; by default ONNX
+                Runtime uses every core
+        """
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_num_threads is not None:
+            options.intra_op_num_threads = intra_op_num_threads
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.max_length = max_length
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Run one batch through the model and mean-pool the token embeddings."""
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feed = {name: inputs[name].astype(np.int64) for name in self.input_names}
+        token_embeddings = self.session.run(None, feed)[0]
+
+        # Average over real tokens only, ignoring padding
+        mask = inputs["attention_mask"][:, :, np.newaxis].astype(np.float32)
+        return (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 64,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Encode texts, mirroring SentenceTransformer.encode.
+
+        Args:
+            sentences: Text or list of texts to encode
+            batch_size: Number of texts per forward pass
+            convert_to_numpy: Accepted for compatibility; results are always NumPy
+            normalize_embeddings: If True, L2-normalize each embedding
+            show_progress_bar: If True, print progress after each batch
+
+        Returns:
+            Float32 array of embeddings in input order
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        # Batch texts of similar length together to minimize padding
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            batches.append(self._encode_batch([texts[i] for i in order[start:start + batch_size]]))
+            if show_progress_bar:
+                print(f"Encoded {min(start + batch_size, len(texts))}/{len(texts)} texts")
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Undo the length sort so rows line up with the input
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+
+        if normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+        return embeddings[0] if single else embeddings
+
+def export_quantized_model(output_dir: str,
+                           model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> None:
+    """
+    Export a Hugging Face encoder to ONNX and quantize its weights to int8.
+
+    Args:
+        output_dir: Directory to write the tokenizer and quantized model to
+        model_name: Hugging Face model to export
+    """
+    import torch
+    from transformers import AutoModel
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    example = tokenizer(["An example sentence."], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+
+    print(f"Exporting {model_name} to ONNX...")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(example[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]},
+            opset_version=14
+        )
+
+    print("Quantizing weights to int8...")
+    quantize_dynamic(fp32_path, os.path.join(output_dir, MODEL_FILE), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    print(f"Quantized model saved to {output_dir}")
+
+if __name__ == "__main__":
+    export_quantized_model(sys.argv[1] if len(sys.argv) > 1 else "./onnx_minilm")
@@ -0,0 +1,26 @@
+import httpx
+from openai import OpenAI
+
+# One connection pool shared by every chatbot instance, so TLS sessions and
+# keep-alive connections are reused across chat calls and Streamlit reruns
+_HTTP_CLIENT = httpx.Client(
+    timeout=60,
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+)
+_OPENAI_CLIENTS = {}
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """
+    Get the shared OpenAI client for an API key.
+    
+    Args:
+        api_key: OpenAI API key
+        
+    Returns:
+        OpenAI client backed by the shared HTTP connection pool
+    """
+    client = _OPENAI_CLIENTS.get(api_key)
+    if client is None:
+        client = OpenAI(api_key=api_key, http_client=_HTTP_CLIENT)
+        _OPENAI_CLIENTS[api_key] = client
+    return client
@@ -1,36 +1,62 @@
 import os
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import json
+import time
+import random
+import asyncio
+import queue
+import tempfile
+from contextlib import ExitStack
+from typing import List, Dict, Any, Optional, Iterator
+import numpy as np
+from openai import AsyncOpenAI, RateLimitError, InternalServerError, APIConnectionError
 from dotenv import load_dotenv
 from transcript_loader import TranscriptLoader
 from vector_store import VectorStore
+from semantic_cache import SemanticCache
+from rate_limiter import RateLimiter
+from openai_client import get_openai_client
+from chatbot_mixin import ChatbotMixin
+from context_utils import get_encoding, dedupe_results, fit_to_token_budget
 
 # Load environment variables
 load_dotenv()
 
-class RAGChatbot:
+class RAGChatbot(ChatbotMixin):
     """RAG chatbot for Stanford ETL transcripts."""
     
-    def __init__(self, transcripts_dir: str, vector_store_dir: str = "./chroma_db"):
+    def __init__(self, transcripts_dir: str, vector_store_dir: str = "./chroma_db",
+                 use_semantic_cache: bool = False, cache_file: str = "./chat_cache.pkl",
+                 backend: Optional[str] = None):
         """
         Initialize the RAG chatbot.
         
         Args:
             transcripts_dir: Directory containing transcript files
             vector_store_dir: Directory for vector store persistence
+            use_semantic_cache: If True, reuse responses for near-duplicate queries
+            cache_file: File used to persist the semantic cache
+            backend: Vector store search backend (see vector_store.BACKENDS);
+                defaults to $VECTOR_BACKEND, or "chroma"
         """
         self.transcripts_dir = transcripts_dir
-        self.vector_store = VectorStore(vector_store_dir)
+        self.vector_store = VectorStore(vector_store_dir, backend=backend)
         self.transcript_loader = TranscriptLoader(transcripts_dir)
+        self.semantic_cache = SemanticCache(cache_file) if use_semantic_cache else None
         
         # Initialize OpenAI client
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self.client = get_openai_client(api_key)
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
         
+        # Response length and context window used to budget prompt tokens
+        self.max_tokens = 1000
+        self.context_window = int(os.getenv("OPENAI_CONTEXT_WINDOW", "128000"))
+        self.encoding = get_encoding(self.model)
+        
         # System prompt for the chatbot
         self.system_prompt = """You are a helpful assistant that answers questions based on Stanford ETL (Entrepreneurship Through Leadership) transcripts. 
 
@@ -45,28 +71,58 @@ When answering questions:
 
 Always base your responses on the provided context from the transcripts."""
     
-    def setup_vector_store(self, force_rebuild: bool = False) -> None:
+    async def asetup_vector_store(self, force_rebuild: bool = False, progress: Optional[queue.Queue] = None,
+                                  transcripts_per_batch: int = 8) -> None:
         """
-        Set up the vector store with transcript data.
+        Set up the vector store like setup_vector_store(), without blocking the event loop.
+        
+        Transcripts stream from disk in the same batches; each batch is
+        chunked and encoded by aadd_transcripts() on worker threads.
         
         Args:
             force_rebuild: If True, clear existing data and rebuild
+            progress: Optional queue that receives progress messages
+            transcripts_per_batch: Number of transcripts encoded together
         """
-        if force_rebuild:
-            self.vector_store.clear_collection()
-        
-        # Check if vector store already has data
-        collection_info = self.vector_store.get_collection_info()
-        if collection_info["total_chunks"] > 0 and not force_rebuild:
-            print(f"Vector store already contains {collection_info['total_chunks']} chunks")
+        if not await asyncio.to_thread(self._needs_setup, force_rebuild, progress):
             return
         
-        # Load transcripts and add to vector store
-        transcripts = self.transcript_loader.load_all_transcripts()
-        if transcripts:
-            self.vector_store.add_transcripts(transcripts)
-        else:
-            print("No transcripts found to add to vector store")
+        added = 0
+        batches = self._iter_transcript_batches(transcripts_per_batch)
+        stack = ExitStack()
+        try:
+            total_size = await asyncio.to_thread(self.transcript_loader.get_total_size)
+            pool = await asyncio.to_thread(stack.enter_context, self.vector_store.encoding_pool(total_size))
+            while True:
+                # Reading the next batch may wait on disk
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                await self.vector_store.aadd_transcripts(batch, pool=pool)
+                added += len(batch)
+                self._report(progress, f"Indexed {added} transcripts")
+        finally:
+            # Stops the transcript reader if setup ended early; a batch still
+            # being read on a cancelled worker thread finishes on its own
+            if not batches.gi_running:
+                batches.close()
+            # Joining the pool's workers blocks, so do it off the loop too
+            await asyncio.to_thread(stack.close)
+        
+        # Saving the index writes to disk
+        await asyncio.to_thread(self._finish_setup, added, progress)
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query, reusing the embedding of a previously seen query.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            L2-normalized query embedding
+        """
+        return self.vector_store.embed_query(query)
     
     def get_relevant_context(self, query: str, n_results: int = 5) -> str:
         """
@@ -79,7 +135,9 @@ Always base your responses on the provided context from the transcripts."""
         Returns:
             Formatted context string
         """
-        results = self.vector_store.search(query, n_results)
+        # Over-fetch so there are candidates left after near-duplicates are dropped
+        candidates = self.vector_store.search(query, n_results * 3, query_embedding=self.embed_query(query))
+        results = dedupe_results(candidates, n_results)
         
         if not results:
             return "No relevant context found."
@@ -92,58 +150,339 @@ Always base your responses on the provided context from the transcripts."""
             
             context_parts.append(f"Source {i} (from '{title}'):\n{content}\n")
         
+        # Leave room in the context window for the prompt, question and response
+        budget = (self.context_window - self.max_tokens
+                  - len(self.encoding.encode(self.system_prompt + query)) - 100)
+        context_parts = fit_to_token_budget(context_parts, budget, self.encoding)
+        
         return "\n".join(context_parts)
     
-    def generate_response(self, query: str, context: str) -> str:
+    def _count_request_tokens(self, request: Dict[str, Any]) -> int:
+        """Estimate the prompt plus completion tokens a request will consume."""
+        prompt_tokens = sum(
+            len(self.encoding.encode(message["content"])) + 4
+            for message in request["messages"]
+        ) + 2
+        return prompt_tokens + request["max_tokens"]
+    
+    async def _agenerate_response(self, client: AsyncOpenAI, query: str, context: str,
+                                  semaphore: asyncio.Semaphore, limiter: RateLimiter,
+                                  max_attempts: int = 5) -> str:
         """
-        Generate a response using OpenAI API.
+        Generate a response asynchronously, retrying transient API errors.
         
         Args:
+            client: Async OpenAI client bound to the running event loop
             query: User query
             context: Relevant context from transcripts
+            semaphore: Semaphore bounding concurrent requests
+            limiter: Shared request/token rate limiter
+            max_attempts: Maximum attempts before giving up
             
         Returns:
             Generated response
         """
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Context from Stanford ETL transcripts:\n\n{context}\n\nQuestion: {query}\n\nPlease answer based on the provided context."}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
+        request = self._completion_request(query, context)
+        tokens = self._count_request_tokens(request)
+        
+        async with semaphore:
+            for attempt in range(max_attempts):
+                await limiter.acquire(tokens)
+                try:
+                    response = await client.chat.completions.create(**request)
+                    return response.choices[0].message.content
+                except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                    if attempt == max_attempts - 1:
+                        return f"Error generating response: {str(e)}"
+                    # Exponential backoff with jitter
+                    await asyncio.sleep(min(2 ** attempt, 60) + random.random())
+                except Exception as e:
+                    return f"Error generating response: {str(e)}"
+    
+    def chat_stream(self, query: str, n_context_results: int = 5, no_cache: bool = False) -> Dict[str, Any]:
+        """
+        Process a query like chat(), but stream the response.
+        
+        Args:
+            query: User query
+            n_context_results: Number of context chunks to retrieve
+            no_cache: If True, bypass the semantic cache (e.g. for sensitive queries)
             
-            return response.choices[0].message.content
+        Returns:
+            Dictionary like chat()'s, whose "response" is an iterator of text deltas
+        """
+        use_cache = self.semantic_cache is not None and not no_cache
+        if use_cache:
+            query_embedding = self.embed_query(query)
+            cached = self.semantic_cache.get(query_embedding, n_context_results)
+            if cached is not None:
+                return {**cached, "query": query, "response": iter([cached["response"]])}
+        
+        context = self.get_relevant_context(query, n_context_results)
+        stream = self.generate_response_stream(query, context)
+        if use_cache:
+            stream = self._cache_stream(stream, query_embedding, query, context, n_context_results)
+        
+        return {
+            "query": query,
+            "response": stream,
+            "context_used": context,
+            "context_chunks": n_context_results
+        }
+    
+    def _cache_stream(self, stream: Iterator[str], query_embedding: np.ndarray, query: str,
+                      context: str, n_context_results: int) -> Iterator[str]:
+        """Pass a response stream through, caching the full response once it completes."""
+        parts = []
+        for delta in stream:
+            parts.append(delta)
+            yield delta
+        
+        response = "".join(parts)
+        if not response.startswith("Error generating response"):
+            self.semantic_cache.put(query_embedding, {
+                "query": query,
+                "response": response,
+                "context_used": context,
+                "context_chunks": n_context_results
+            })
+    
+    async def chat_many(self, queries: List[str], n_context_results: int = 5,
+                        concurrency: int = 50, requests_per_minute: float = 500,
+                        tokens_per_minute: float = 30000) -> List[Dict[str, Any]]:
+        """
+        Answer many queries with concurrent, rate-limited OpenAI requests.
+        
+        Args:
+            queries: User queries
+            n_context_results: Number of context chunks to retrieve per query
+            concurrency: Maximum number of requests in flight
+            requests_per_minute: Request quota to stay under
+            tokens_per_minute: Token quota to stay under
             
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
+        Returns:
+            One chat result dictionary per query, in input order
+        """
+        # Retrieval is local, so only the OpenAI round-trips are fanned out;
+        # it runs on a worker thread to keep the event loop free meanwhile
+        contexts = await asyncio.to_thread(
+            lambda: [self.get_relevant_context(query, n_context_results) for query in queries]
+        )
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        # The async client's connection pool belongs to the event loop it
+        # was first used on, so each call (and each asyncio.run) gets its own
+        async with AsyncOpenAI(api_key=self.api_key) as client:
+            responses = await asyncio.gather(*[
+                self._agenerate_response(client, query, context, semaphore, limiter)
+                for query, context in zip(queries, contexts)
+            ])
+        
+        return [
+            {
+                "query": query,
+                "response": response,
+                "context_used": context,
+                "context_chunks": n_context_results
+            }
+            for query, context, response in zip(queries, contexts, responses)
+        ]
     
-    def chat(self, query: str, n_context_results: int = 5) -> Dict[str, Any]:
+    def chat(self, query: str, n_context_results: int = 5, no_cache: bool = False) -> Dict[str, Any]:
         """
         Main chat method that processes a query and returns a response.
         
         Args:
             query: User query
             n_context_results: Number of context chunks to retrieve
+            no_cache: If True, bypass the semantic cache (e.g. for sensitive queries)
             
         Returns:
             Dictionary containing response and metadata
         """
+        use_cache = self.semantic_cache is not None and not no_cache
+        if use_cache:
+            query_embedding = self.embed_query(query)
+            cached = self.semantic_cache.get(query_embedding, n_context_results)
+            if cached is not None:
+                return {**cached, "query": query}
+        
         # Get relevant context
         context = self.get_relevant_context(query, n_context_results)
         
         # Generate response
         response = self.generate_response(query, context)
         
-        return {
+        result = {
             "query": query,
             "response": response,
             "context_used": context,
             "context_chunks": n_context_results
         }
+        
+        # Don't cache failed generations
+        if use_cache and not response.startswith("Error generating response"):
+            self.semantic_cache.put(query_embedding, result)
+        
+        return result
+    
+    def _generate_inline_responses(self, queries: List[str], contexts: List[str]) -> Optional[List[str]]:
+        """
+        Answer several queries with a single chat completion.
+        
+        Args:
+            queries: User queries
+            contexts: Relevant context for each query
+            
+        Returns:
+            One response per query, or None if the reply couldn't be parsed
+        """
+        blocks = [
+            f"[{i}] Context:\n{context}\nQuestion: {query}"
+            for i, (query, context) in enumerate(zip(queries, contexts), 1)
+        ]
+        prompt = (
+            "Answer each of the following questions using only its own Context block. "
+            'Return a JSON object of the form {"answers": [...]} with one answer string '
+            "per question, in the same order.\n\n" + "\n\n".join(blocks)
+        )
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                # Budget one normal response per question, within the model's output limit
+                max_tokens=min(self.max_tokens * len(queries), 4096),
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+            answers = json.loads(response.choices[0].message.content)["answers"]
+        except Exception as e:
+            print(f"Error generating inline batch response: {str(e)}")
+            return None
+        
+        if not isinstance(answers, list) or len(answers) != len(queries) \
+                or not all(isinstance(answer, str) for answer in answers):
+            return None
+        return answers
+    
+    def chat_batch_inline(self, queries: List[str], n_context_results: int = 5,
+                          group_size: int = 10) -> List[Dict[str, Any]]:
+        """
+        Answer queries in groups, packing each group into one chat completion.
+        
+        The system prompt is sent once per group instead of once per query,
+        and each group uses a single request against the rate limit. Groups
+        whose reply can't be parsed fall back to one request per query.
+        
+        Args:
+            queries: User queries
+            n_context_results: Number of context chunks to retrieve per query
+            group_size: Maximum number of queries per request
+            
+        Returns:
+            One chat result dictionary per query, in input order
+        """
+        results = []
+        for start in range(0, len(queries), group_size):
+            group = queries[start:start + group_size]
+            contexts = [self.get_relevant_context(query, n_context_results) for query in group]
+            
+            responses = self._generate_inline_responses(group, contexts)
+            if responses is None:
+                responses = [self.generate_response(query, context) for query, context in zip(group, contexts)]
+            
+            results.extend(
+                {
+                    "query": query,
+                    "response": response,
+                    "context_used": context,
+                    "context_chunks": n_context_results
+                }
+                for query, context, response in zip(group, contexts, responses)
+            )
+        
+        return results
+    
+    def chat_batch(self, queries: List[str], n_context_results: int = 5,
+                   poll_interval: float = 30) -> List[Dict[str, Any]]:
+        """
+        Answer many queries through the OpenAI Batch API.
+        
+        Batch requests are billed at a discount and draw on a separate rate
+        limit pool, but may take up to 24 hours to complete, so this is meant
+        for offline evaluation and re-scoring jobs.
+        
+        Args:
+            queries: User queries
+            n_context_results: Number of context chunks to retrieve per query
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            One chat result dictionary per query, in input order
+        """
+        contexts = [self.get_relevant_context(query, n_context_results) for query in queries]
+        
+        # One JSONL line per query, using the same arguments as generate_response
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            batch_input_path = f.name
+            for i, (query, context) in enumerate(zip(queries, contexts)):
+                f.write(json.dumps({
+                    "custom_id": f"query-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._completion_request(query, context)
+                }) + "\n")
+        
+        try:
+            with open(batch_input_path, 'rb') as f:
+                batch_input = self.client.files.create(file=f, purpose="batch")
+        finally:
+            os.remove(batch_input_path)
+        
+        batch = self.client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"Submitted batch {batch.id} with {len(queries)} requests")
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            print(f"Batch {batch.id}: {batch.status} ({counts.completed}/{counts.total} completed)")
+        
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+        
+        # Demux results by custom_id; output order is not guaranteed
+        responses = {}
+        if batch.output_file_id:
+            output = self.client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                result = item.get("response") or {}
+                if item.get("error") or result.get("status_code") != 200:
+                    responses[item["custom_id"]] = f"Error generating response: {item.get('error') or result.get('body')}"
+                else:
+                    responses[item["custom_id"]] = result["body"]["choices"][0]["message"]["content"]
+        
+        return [
+            {
+                "query": query,
+                "response": responses.get(f"query-{i}", "Error generating response: no result returned"),
+                "context_used": context,
+                "context_chunks": n_context_results
+            }
+            for i, (query, context) in enumerate(zip(queries, contexts))
+        ]
     
     def get_transcript_summary(self) -> Dict[str, Any]:
         """
@@ -1,8 +1,10 @@
 import os
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 from dotenv import load_dotenv
 from transcript_loader import TranscriptLoader
+from openai_client import get_openai_client
+from chatbot_mixin import ChatbotMixin
+from context_utils import get_encoding, dedupe_results, fit_to_token_budget
 
 # Load environment variables
 load_dotenv()
@@ -18,23 +20,26 @@ except Exception as e:
     from simple_vector_store import SimpleVectorStore
     USE_CHROMADB = False
 
-class RAGChatbotFallback:
+class RAGChatbotFallback(ChatbotMixin):
     """RAG chatbot for Stanford ETL transcripts with fallback vector store."""
     
-    def __init__(self, transcripts_dir: str, vector_store_dir: str = "./vector_store"):
+    def __init__(self, transcripts_dir: str, vector_store_dir: str = "./vector_store",
+                 backend: Optional[str] = None):
         """
         Initialize the RAG chatbot.
         
         Args:
             transcripts_dir: Directory containing transcript files
             vector_store_dir: Directory for vector store persistence
+            backend: ChromaDB search backend (see vector_store.BACKENDS);
+                ignored by the simple vector store
         """
         self.transcripts_dir = transcripts_dir
         self.transcript_loader = TranscriptLoader(transcripts_dir)
         
         # Initialize vector store based on availability
         if USE_CHROMADB:
-            self.vector_store = VectorStore(vector_store_dir)
+            self.vector_store = VectorStore(vector_store_dir, backend=backend)
         else:
             self.vector_store = SimpleVectorStore(vector_store_dir)
         
@@ -43,9 +48,14 @@ class RAGChatbotFallback:
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
         
+        # Response length and context window used to budget prompt tokens
+        self.max_tokens = 1000
+        self.context_window = int(os.getenv("OPENAI_CONTEXT_WINDOW", "128000"))
+        self.encoding = get_encoding(self.model)
+        
         # System prompt for the chatbot
         self.system_prompt = """You are a helpful assistant that answers questions based on Stanford ETL (Entrepreneurship Through Leadership) transcripts. 
 
@@ -60,41 +70,28 @@ When answering questions:
 
 Always base your responses on the provided context from the transcripts."""
     
-    def setup_vector_store(self, force_rebuild: bool = False) -> None:
+    def _add_transcripts(self, transcripts: List[Dict[str, Any]], pool=None) -> None:
         """
-        Set up the vector store with transcript data.
+        Add a batch of transcripts to whichever vector store is in use.
         
         Args:
-            force_rebuild: If True, clear existing data and rebuild
-        """
-        if force_rebuild:
-            self.vector_store.clear_collection()
-        
-        # Check if vector store already has data
-        collection_info = self.vector_store.get_collection_info()
-        if collection_info["total_chunks"] > 0 and not force_rebuild:
-            print(f"Vector store already contains {collection_info['total_chunks']} chunks")
-            return
-        
-        # Load transcripts and add to vector store
-        transcripts = self.transcript_loader.load_all_transcripts()
-        if transcripts:
-            if USE_CHROMADB:
-                self.vector_store.add_transcripts(transcripts)
-            else:
-                # For simple vector store, we need to prepare the data differently
-                texts = []
-                metadatas = []
-                for transcript in transcripts:
-                    for chunk in transcript['chunks']:
-                        texts.append(chunk['content'])
-                        metadatas.append({
-                            'title': transcript['title'],
-                            'content': chunk['content']
-                        })
-                self.vector_store.add_texts(texts, metadatas)
+            transcripts: List of transcript dictionaries
+            pool: Encoding pool from the vector store's encoding_pool()
+        """
+        if USE_CHROMADB:
+            self.vector_store.add_transcripts(transcripts, pool=pool)
         else:
-            print("No transcripts found to add to vector store")
+            # For simple vector store, we need to prepare the data differently
+            texts = []
+            metadatas = []
+            for transcript in transcripts:
+                for chunk in transcript['chunks']:
+                    texts.append(chunk['content'])
+                    metadatas.append({
+                        'title': transcript['title'],
+                        'content': chunk['content']
+                    })
+            self.vector_store.add_texts(texts, metadatas, pool=pool)
     
     def get_relevant_context(self, query: str, n_results: int = 5) -> str:
         """
@@ -107,7 +104,9 @@ Always base your responses on the provided context from the transcripts."""
         Returns:
             Formatted context string
         """
-        results = self.vector_store.search(query, n_results)
+        # Over-fetch so there are candidates left after near-duplicates are dropped
+        candidates = self.vector_store.search(query, n_results * 3)
+        results = dedupe_results(candidates, n_results)
         
         if not results:
             return "No relevant context found."
@@ -120,34 +119,12 @@ Always base your responses on the provided context from the transcripts."""
             
             context_parts.append(f"Source {i} (from '{title}'):\n{content}\n")
         
-        return "\n".join(context_parts)
-    
-    def generate_response(self, query: str, context: str) -> str:
-        """
-        Generate a response using OpenAI API.
+        # Leave room in the context window for the prompt, question and response
+        budget = (self.context_window - self.max_tokens
+                  - len(self.encoding.encode(self.system_prompt + query)) - 100)
+        context_parts = fit_to_token_budget(context_parts, budget, self.encoding)
         
-        Args:
-            query: User query
-            context: Relevant context from transcripts
-            
-        Returns:
-            Generated response
-        """
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Context from Stanford ETL transcripts:\n\n{context}\n\nQuestion: {query}\n\nPlease answer based on the provided context."}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
+        return "\n".join(context_parts)
     
     def chat(self, query: str, n_context_results: int = 5) -> Dict[str, Any]:
         """
@@ -173,6 +150,26 @@ Always base your responses on the provided context from the transcripts."""
             "context_chunks": n_context_results
         }
     
+    def chat_stream(self, query: str, n_context_results: int = 5) -> Dict[str, Any]:
+        """
+        Process a query like chat(), but stream the response.
+        
+        Args:
+            query: User query
+            n_context_results: Number of context chunks to retrieve
+            
+        Returns:
+            Dictionary like chat()'s, whose "response" is an iterator of text deltas
+        """
+        context = self.get_relevant_context(query, n_context_results)
+        
+        return {
+            "query": query,
+            "response": self.generate_response_stream(query, context),
+            "context_used": context,
+            "context_chunks": n_context_results
+        }
+    
     def get_transcript_summary(self) -> Dict[str, Any]:
         """
         Get summary of available transcripts.
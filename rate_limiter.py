@@ -0,0 +1,56 @@
+import time
+import asyncio
+
+class RateLimiter:
+    """Token-bucket limiter for OpenAI request and token quotas."""
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 30000):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Maximum requests per minute
+            tokens_per_minute: Maximum tokens per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        # Both buckets start full and refill continuously
+        self.available_requests = requests_per_minute
+        self.available_tokens = tokens_per_minute
+        self.last_update = time.monotonic()
+
+    def _refill(self):
+        """Refill both buckets for the time elapsed since the last update."""
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.last_update = now
+        self.available_requests = min(
+            self.requests_per_minute,
+            self.available_requests + self.requests_per_minute * elapsed / 60
+        )
+        self.available_tokens = min(
+            self.tokens_per_minute,
+            self.available_tokens + self.tokens_per_minute * elapsed / 60
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until capacity is available for one request of the given size.
+
+        Args:
+            tokens: Estimated tokens consumed by the request
+        """
+        # A request larger than the whole bucket would otherwise wait forever
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            self._refill()
+            if self.available_requests >= 1 and self.available_tokens >= tokens:
+                self.available_requests -= 1
+                self.available_tokens -= tokens
+                return
+
+            # Sleep roughly until the scarcer bucket has refilled enough
+            request_wait = (1 - self.available_requests) * 60 / self.requests_per_minute
+            token_wait = (tokens - self.available_tokens) * 60 / self.tokens_per_minute
+            await asyncio.sleep(max(request_wait, token_wait, 0.001))
@@ -0,0 +1,143 @@
+import os
+import time
+import pickle
+from typing import Dict, Any, Optional
+import numpy as np
+
+class SemanticCache:
+    """Cache chat responses keyed by normalized query embeddings."""
+
+    def __init__(self, cache_file: str = "./chat_cache.pkl", threshold: float = 0.95,
+                 ttl_seconds: float = 3600, max_entries: int = 1000):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            cache_file: File used to persist cached responses
+            threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Maximum age of a cached response
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.cache_file = cache_file
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # Parallel storage: one embedding row per cached response
+        self.embeddings = None
+        self.results = []
+        self.created_at = []
+        self.last_access = []
+        self._load()
+
+    def _load(self):
+        """Load cached entries from disk."""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            self.embeddings = data['embeddings']
+            self.results = data['results']
+            self.created_at = data['created_at']
+            self.last_access = data['last_access']
+            self._expire()
+        except Exception as e:
+            print(f"Error loading chat cache: {e}")
+            self.clear()
+
+    def _save(self):
+        """Persist cached entries to disk."""
+        try:
+            with open(self.cache_file, 'wb') as f:
+                pickle.dump({
+                    'embeddings': self.embeddings,
+                    'results': self.results,
+                    'created_at': self.created_at,
+                    'last_access': self.last_access
+                }, f)
+        except Exception as e:
+            print(f"Error saving chat cache: {e}")
+
+    def _keep(self, keep: np.ndarray):
+        """Retain only the entries selected by a boolean mask."""
+        self.embeddings = self.embeddings[keep]
+        self.results = [r for r, k in zip(self.results, keep) if k]
+        self.created_at = [t for t, k in zip(self.created_at, keep) if k]
+        self.last_access = [t for t, k in zip(self.last_access, keep) if k]
+
+    def _expire(self):
+        """Drop entries older than the TTL."""
+        if not self.results:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        keep = np.array(self.created_at) >= cutoff
+        if not keep.all():
+            self._keep(keep)
+
+    def get(self, query_embedding: np.ndarray, n_context_results: int,
+            max_candidates: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response for a query embedding.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+            n_context_results: Number of context chunks the caller asked for
+            max_candidates: Number of closest entries checked for a match
+
+        Returns:
+            Cached chat result, or None on a miss
+        """
+        self._expire()
+        if not self.results:
+            return None
+
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        similarities = self.embeddings @ query_embedding
+
+        # The closest entry may have been answered with a different number
+        # of context chunks, so try the best few above the threshold
+        k = min(max_candidates, len(similarities))
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        for i in candidates[np.argsort(-similarities[candidates])].tolist():
+            if similarities[i] < self.threshold:
+                break
+            if self.results[i]['context_chunks'] == n_context_results:
+                self.last_access[i] = time.time()
+                return self.results[i]
+        return None
+
+    def put(self, query_embedding: np.ndarray, result: Dict[str, Any]) -> None:
+        """
+        Add a chat result to the cache.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+            result: Chat result dictionary to cache
+        """
+        now = time.time()
+        row = np.asarray(query_embedding, dtype=np.float32)[np.newaxis, :]
+        if self.embeddings is None or not self.results:
+            self.embeddings = row
+        else:
+            self.embeddings = np.vstack([self.embeddings, row])
+        self.results.append(result)
+        self.created_at.append(now)
+        self.last_access.append(now)
+
+        # Evict the least recently used entry once over capacity
+        if len(self.results) > self.max_entries:
+            keep = np.ones(len(self.results), dtype=bool)
+            keep[int(np.argmin(self.last_access))] = False
+            self._keep(keep)
+
+        self._save()
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self.embeddings = None
+        self.results = []
+        self.created_at = []
+        self.last_access = []
+        if os.path.exists(self.cache_file):
+            os.remove(self.cache_file)
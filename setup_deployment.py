@@ -6,11 +6,52 @@ This script helps set up the vector database on the server.
 
 import os
 import sys
+import json
+import argparse
 from rag_chatbot import RAGChatbot
 from dotenv import load_dotenv
 
+def parse_args():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Set up the Stanford ETL RAG Chatbot")
+    parser.add_argument(
+        "--batch",
+        metavar="QUESTIONS_FILE",
+        help="Answer the questions in this file (one per line) via the OpenAI Batch API"
+    )
+    parser.add_argument(
+        "--output",
+        default="batch_results.jsonl",
+        help="Where to write batch results (default: batch_results.jsonl)"
+    )
+    return parser.parse_args()
+
+def run_batch(chatbot, questions_file, output_file):
+    """Answer a file of questions offline through the OpenAI Batch API."""
+    with open(questions_file, 'r', encoding='utf-8') as f:
+        questions = [line.strip() for line in f if line.strip()]
+    
+    if not questions:
+        print(f"❌ Error: No questions found in {questions_file}")
+        sys.exit(1)
+    
+    print(f"📦 Submitting {len(questions)} questions to the OpenAI Batch API...")
+    try:
+        results = chatbot.chat_batch(questions)
+    except Exception as e:
+        print(f"❌ Error running batch: {str(e)}")
+        sys.exit(1)
+    
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+    
+    print(f"✅ Wrote {len(results)} results to {output_file}")
+
 def main():
     """Main setup function."""
+    args = parse_args()
+    
     print("🚀 Stanford ETL RAG Chatbot - Deployment Setup")
     print("=" * 50)
     
@@ -45,6 +86,9 @@ def main():
     vector_info = chatbot.get_vector_store_info()
     if vector_info.get("total_chunks", 0) > 0:
         print(f"✅ Vector store already contains {vector_info['total_chunks']} chunks")
+        if args.batch:
+            run_batch(chatbot, args.batch, args.output)
+            return
         response = input("Do you want to rebuild the vector store? (y/N): ").strip().lower()
         if response != 'y':
             print("Setup complete! Vector store is ready.")
@@ -65,6 +109,10 @@ def main():
         print(f"  Total Words: {transcript_summary.get('total_words', 0):,}")
         print(f"  Vector Chunks: {vector_info.get('total_chunks', 0)}")
         
+        if args.batch:
+            run_batch(chatbot, args.batch, args.output)
+            return
+        
         print("\n🎉 Setup complete! Your RAG chatbot is ready to use.")
         print("You can now run:")
         print("  - streamlit run streamlit_app.py (for web interface)")
@@ -1,133 +1,648 @@
 import os
 import json
 import pickle
-from typing import List, Dict, Any
+import asyncio
+import multiprocessing
+from contextlib import contextmanager
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+import torch
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from encode_workers import init_encode_worker, encode_shard, worker_count
+
+# hnswlib is optional; without it search falls back to brute force
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# numba is optional; without it single-query search uses a NumPy matmul
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _topk_cosine(embeddings, query, k):
+        """
+        Fused dot-product and top-k over normalized embeddings.
+        
+        Blocks of 1024 rows are scored in parallel, each keeping its own
+        sorted top-k, so no N-length similarity array is materialized. The
+        per-block candidates are reduced at the end.
+        """
+        n, d = embeddings.shape
+        block_size = 1024
+        n_blocks = (n + block_size - 1) // block_size
+        block_scores = np.full((n_blocks, k), -np.inf, dtype=np.float32)
+        block_indices = np.full((n_blocks, k), -1, dtype=np.int64)
+        
+        for b in prange(n_blocks):
+            for i in range(b * block_size, min((b + 1) * block_size, n)):
+                score = np.float32(0.0)
+                for j in range(d):
+                    score += embeddings[i, j] * query[j]
+                if score > block_scores[b, k - 1]:
+                    # Insertion into the block's descending top-k
+                    pos = k - 1
+                    while pos > 0 and block_scores[b, pos - 1] < score:
+                        block_scores[b, pos] = block_scores[b, pos - 1]
+                        block_indices[b, pos] = block_indices[b, pos - 1]
+                        pos -= 1
+                    block_scores[b, pos] = score
+                    block_indices[b, pos] = i
+        
+        scores = block_scores.ravel()
+        indices = block_indices.ravel()
+        order = np.argsort(-scores)[:k]
+        return indices[order], scores[order]
 
 class SimpleVectorStore:
     """Simple vector store using sentence transformers and numpy."""
     
-    def __init__(self, store_dir: str = "./simple_vector_store"):
+    def __init__(self, store_dir: str = "./simple_vector_store", batch_window: float = 0.005,
+                 use_int8: bool = False, use_hnsw: bool = True,
+                 parallel_threshold: int = 10000, torch_threads: Optional[int] = None):
         """
         Initialize the simple vector store.
         
         Args:
             store_dir: Directory for storing vectors and metadata
+            batch_window: Seconds asearch() waits to coalesce concurrent queries
+            use_int8: If True, scan an int8-quantized copy of the embeddings;
+                requires use_hnsw=False
+            use_hnsw: If True, search an HNSW index instead of scanning every embedding
+            parallel_threshold: Estimated text count of an ingest above which
+                encoding is spread across worker processes
+            torch_threads: If set, the number of threads torch uses for
+                in-process encoding; this is a process-wide setting, so by
+                default torch's own choice is left alone
+        
+        Search uses the HNSW index when use_hnsw is set and hnswlib is
+        installed. Otherwise every embedding is scanned: single float32
+        queries go through the fused numba kernel when numba is installed,
+        and everything else (batches, or use_int8) through one matmul.
         """
+        if use_int8 and use_hnsw:
+            raise ValueError("use_int8 only applies to brute-force search; pass use_hnsw=False")
+        
         self.store_dir = store_dir
-        self.embeddings_file = os.path.join(store_dir, "embeddings.pkl")
-        self.metadata_file = os.path.join(store_dir, "metadata.json")
+        self.embeddings_file = os.path.join(store_dir, "embeddings.f32")
+        self.length_file = os.path.join(store_dir, "len.txt")
+        self.metadata_file = os.path.join(store_dir, "metadata.jsonl")
+        self.index_file = os.path.join(store_dir, "hnsw_index.bin")
+        
+        # Earlier on-disk layouts, migrated on load
+        self.npy_embeddings_file = os.path.join(store_dir, "embeddings.npy")
+        self.legacy_embeddings_file = os.path.join(store_dir, "embeddings.pkl")
+        self.legacy_metadata_file = os.path.join(store_dir, "metadata.json")
         
         # Create directory if it doesn't exist
         os.makedirs(store_dir, exist_ok=True)
         
         # Initialize sentence transformer model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        if torch_threads is not None:
+            torch.set_num_threads(torch_threads)
+        self.model_name = 'all-MiniLM-L6-v2'
+        self.model = SentenceTransformer(self.model_name)
+        self.parallel_threshold = parallel_threshold
+        
+        # Query coalescing state for asearch()
+        self.batch_window = batch_window
+        self._search_queue = None
+        self._search_loop = None
+        self._search_task = None
+        
+        # Embeddings are appended into a preallocated float32 memmap whose
+        # capacity doubles when full. Rows past self._len are unused, and
+        # len.txt records how many rows have been committed
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self._emb = None
+        self._len = 0
+        
+        # int8 search copy, rebuilt lazily after the embeddings change
+        self.use_int8 = use_int8
+        self._int8 = None
+        self._int8_scale = 1.0
+        
+        # Approximate nearest-neighbor index, built or loaded on first search
+        if use_hnsw and hnswlib is None:
+            print("hnswlib not installed, falling back to brute-force search")
+        self.use_hnsw = use_hnsw and hnswlib is not None
+        self._index = None
+        self._index_dirty = False
         
         # Load existing data if available
-        self.embeddings = []
         self.metadata = []
         self._load_data()
     
-    def _load_data(self):
-        """Load existing embeddings and metadata."""
-        if os.path.exists(self.embeddings_file) and os.path.exists(self.metadata_file):
+    @property
+    def total_chunks(self) -> int:
+        """Number of stored embeddings."""
+        return self._len
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        """View of the stored (N, d) float32 embedding matrix."""
+        if self._emb is None:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return self._emb[:self._len]
+    
+    def _quantized(self) -> np.ndarray:
+        """Return the int8-quantized embeddings, quantizing on first use."""
+        if self._int8 is None:
+            embeddings = self.embeddings
+            # One symmetric scale for the whole matrix
+            self._int8_scale = max(float(np.abs(embeddings).max()), 1e-12) / 127
+            self._int8 = np.round(embeddings / self._int8_scale).astype(np.int8)
+        return self._int8
+    
+    def _int8_similarities(self, query_embeddings: np.ndarray, block_size: int = 65536) -> np.ndarray:
+        """
+        Score queries against the int8 embeddings.
+        
+        NumPy has no BLAS path for integer matmul, so each block of rows is
+        widened to float32 just before its SGEMM. Only the int8 matrix stays
+        resident, a quarter of the float32 footprint.
+        """
+        quantized = self._quantized()
+        similarities = np.empty((len(query_embeddings), len(quantized)), dtype=np.float32)
+        for start in range(0, len(quantized), block_size):
+            block = quantized[start:start + block_size].astype(np.float32)
+            similarities[:, start:start + block_size] = query_embeddings @ block.T
+        return similarities * self._int8_scale
+    
+    def _get_index(self):
+        """Return the HNSW index, loading or building it if needed."""
+        if self._index is not None:
+            return self._index
+        
+        index = hnswlib.Index(space='cosine', dim=self.dimension)
+        if os.path.exists(self.index_file):
             try:
-                with open(self.embeddings_file, 'rb') as f:
-                    self.embeddings = pickle.load(f)
-                with open(self.metadata_file, 'r') as f:
-                    self.metadata = json.load(f)
-                print(f"Loaded {len(self.embeddings)} existing embeddings")
+                index.load_index(self.index_file, max_elements=max(self.total_chunks, 1))
+                if index.get_current_count() == self.total_chunks:
+                    self._index = index
+                    return index
             except Exception as e:
-                print(f"Error loading existing data: {e}")
-                self.embeddings = []
-                self.metadata = []
+                print(f"Error loading HNSW index: {e}")
+            index = hnswlib.Index(space='cosine', dim=self.dimension)
+        
+        print(f"Building HNSW index for {self.total_chunks} embeddings...")
+        index.init_index(max_elements=max(self.total_chunks, 100000), ef_construction=200, M=16)
+        if self.total_chunks:
+            index.add_items(self.embeddings, np.arange(self.total_chunks))
+            index.save_index(self.index_file)
+        self._index = index
+        return index
+    
+    def _add_to_index(self, new_embeddings: np.ndarray, start: int):
+        """Add newly inserted rows to an already-loaded HNSW index."""
+        if self._index is None:
+            return
+        end = start + len(new_embeddings)
+        if end > self._index.get_max_elements():
+            self._index.resize_index(max(end, 2 * self._index.get_max_elements()))
+        self._index.add_items(new_embeddings, np.arange(start, end))
+        self._index_dirty = True
+    
+    def _similarities(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Score normalized query embeddings against every stored embedding.
+        
+        A matmul over the memory-mapped matrix reads each page once in
+        order, so kernel read-ahead prefetches the file as it is scanned.
+        """
+        if self.use_int8:
+            return self._int8_similarities(query_embeddings)
+        
+        return query_embeddings @ self.embeddings.T
+    
+    def _reserve(self, n_rows: int):
+        """
+        Make the embeddings memmap writable and able to hold n_rows.
+        
+        Loaded stores are mapped read-only, so the file is only reopened for
+        writing once something is appended. Capacity doubles as needed.
+        """
+        capacity = len(self._emb) if self._emb is not None else 0
+        if n_rows <= capacity and self._emb.mode == 'r+':
+            return
+        
+        if self._emb is not None:
+            self._emb.flush()
+            self._emb = None
+        if n_rows > capacity:
+            capacity = max(n_rows, 2 * capacity, 1024)
+            with open(self.embeddings_file, 'ab') as f:
+                f.truncate(capacity * self.dimension * np.dtype(np.float32).itemsize)
+        self._emb = np.memmap(self.embeddings_file, dtype=np.float32, mode='r+',
+                              shape=(capacity, self.dimension))
+    
+    def _write_length(self):
+        """Record the number of committed rows."""
+        with open(self.length_file, 'w') as f:
+            f.write(str(self._len))
+    
+    def _append_embeddings(self, new_embeddings: np.ndarray, metadatas: List[Dict[str, Any]]):
+        """
+        Append rows and their metadata to disk.
+        
+        Only the new rows' pages are flushed and metadata lines are appended,
+        so nothing already stored is rewritten. len.txt is updated last, so
+        an interrupted append is ignored on the next load.
+        
+        Rows must already be L2-normalized: search treats the dot product as
+        the cosine similarity and never computes norms at query time.
+        """
+        assert np.allclose(np.linalg.norm(new_embeddings, axis=1), 1.0, atol=1e-3), \
+            "embeddings must be L2-normalized before insertion"
+        start = self._len
+        end = start + len(new_embeddings)
+        self._reserve(end)
+        self._emb[start:end] = new_embeddings
+        self._emb.flush()
+        
+        with open(self.metadata_file, 'a') as f:
+            for metadata in metadatas:
+                f.write(json.dumps(metadata) + '\n')
+        
+        self.metadata.extend(metadatas)
+        self._len = end
+        self._write_length()
+        self._int8 = None
+    
+    @staticmethod
+    def _top_k(similarities: np.ndarray, k: int) -> np.ndarray:
+        """
+        Indices of the k largest similarities in each row, highest first.
+        
+        argpartition selects the top k in O(N), so only those k are sorted.
+        """
+        n = similarities.shape[-1]
+        k = min(k, n)
+        if k <= 0:
+            return np.empty(similarities.shape[:-1] + (0,), dtype=np.intp)
+        if k < n:
+            top = np.argpartition(-similarities, k - 1, axis=-1)[..., :k]
+        else:
+            top = np.broadcast_to(np.arange(n), similarities.shape)
+        order = np.argsort(-np.take_along_axis(similarities, top, axis=-1), axis=-1)
+        return np.take_along_axis(top, order, axis=-1)
+    
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """L2-normalize embedding rows so dot products are cosine similarities."""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+    
+    def _load_data(self):
+        """Load existing embeddings and metadata."""
+        if not os.path.exists(self.length_file):
+            self._migrate_legacy_data()
+            return
+        try:
+            with open(self.length_file, 'r') as f:
+                length = int(f.read().strip() or 0)
+            capacity = os.path.getsize(self.embeddings_file) // (self.dimension * np.dtype(np.float32).itemsize)
+            if capacity:
+                # Pages are read in on demand instead of deserialized up front;
+                # the map is read-only until something is appended
+                self._emb = np.memmap(self.embeddings_file, dtype=np.float32, mode='r',
+                                      shape=(capacity, self.dimension))
+            with open(self.metadata_file, 'r') as f:
+                metadata = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            # Appending after files we can't read would pair new rows with
+            # stale metadata, so start the store over
+            print(f"Error loading existing data, clearing the vector store: {e}")
+            self.clear_collection()
+            return
+        
+        # Drop anything written by an append that never committed
+        self._len = min(length, capacity, len(metadata))
+        self.metadata = metadata[:self._len]
+        try:
+            if len(metadata) != self._len:
+                with open(self.metadata_file, 'w') as f:
+                    for item in self.metadata:
+                        f.write(json.dumps(item) + '\n')
+            if length != self._len:
+                self._write_length()
+        except OSError as e:
+            # A read-only store can still be searched
+            print(f"Error trimming uncommitted data: {e}")
+        print(f"Loaded {self._len} existing embeddings")
+    
+    def _migrate_legacy_data(self):
+        """Convert a store saved as a single embeddings file plus metadata.json."""
+        if not os.path.exists(self.legacy_metadata_file):
+            return
+        try:
+            if os.path.exists(self.npy_embeddings_file):
+                embeddings = np.load(self.npy_embeddings_file)
+            elif os.path.exists(self.legacy_embeddings_file):
+                # Older stores pickled a list of unnormalized per-chunk arrays
+                with open(self.legacy_embeddings_file, 'rb') as f:
+                    embeddings = self._normalize(np.asarray(pickle.load(f), dtype=np.float32))
+            else:
+                return
+            with open(self.legacy_metadata_file, 'r') as f:
+                metadata = json.load(f)
+            
+            self._append_embeddings(
+                np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dimension), metadata
+            )
+            for path in (self.npy_embeddings_file, self.legacy_embeddings_file, self.legacy_metadata_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            print(f"Loaded {self._len} existing embeddings")
+        except Exception as e:
+            print(f"Error loading existing data: {e}")
+            self.clear_collection()
     
     def _save_data(self):
-        """Save embeddings and metadata to disk."""
+        """Save the HNSW index; embeddings and metadata are written as they are appended."""
         try:
-            with open(self.embeddings_file, 'wb') as f:
-                pickle.dump(self.embeddings, f)
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f)
+            if self._index is not None and self._index_dirty:
+                self._index.save_index(self.index_file)
+                self._index_dirty = False
         except Exception as e:
             print(f"Error saving data: {e}")
     
-    def add_texts(self, texts: List[str], metadatas: List[Dict[str, Any]] = None):
+    def close(self):
+        """
+        Save the HNSW index if rows were added to it since it was loaded.
+        
+        Adds only update the index in memory, so the file is written once
+        here rather than on every add_texts() call. An index file left
+        behind by a process that never closed is rebuilt on first search.
+        """
+        self._save_data()
+    
+    @contextmanager
+    def encoding_pool(self, total_chars: int):
+        """
+        Start an encoding pool for the duration of a large ingest.
+        
+        One pool should span a whole ingest rather than each add_texts()
+        call; pass it to add_texts() as pool.
+        
+        Args:
+            total_chars: Approximate size of all text about to be added
+            
+        Yields:
+            The process pool, or None if the ingest is small
+        """
+        if total_chars // 800 <= self.parallel_threshold:
+            yield None
+            return
+        with self._start_pool() as executor:
+            yield executor
+    
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Start one encoding worker process per physical core, each loading its own model."""
+        n_workers = worker_count()
+        print(f"Encoding texts across {n_workers} processes...")
+        return ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_encode_worker,
+            initargs=(SentenceTransformer, self.model_name)
+        )
+    
+    def _encode_parallel(self, texts: List[str], batch_size: int, executor: ProcessPoolExecutor) -> np.ndarray:
+        """
+        Encode texts across the worker processes of a pool.
+        
+        Each worker encodes a contiguous shard, so results concatenate back
+        in input order.
+        """
+        n_workers = worker_count()
+        shard_size = max(batch_size, (len(texts) + n_workers - 1) // n_workers)
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        return np.vstack(list(executor.map(encode_shard, shards, repeat(batch_size))))
+    
+    def add_texts(self, texts: List[str], metadatas: List[Dict[str, Any]] = None,
+                  batch_size: int = 32, pool: Optional[ProcessPoolExecutor] = None):
         """
         Add texts to the vector store.
         
         Args:
             texts: List of text chunks
             metadatas: List of metadata dictionaries
+            batch_size: Number of texts encoded per forward pass
+            pool: Encoding pool from encoding_pool(); if None, one is started
+                for this call when there are more than parallel_threshold texts
         """
         if not texts:
             return
         
         # Generate embeddings
         print(f"Generating embeddings for {len(texts)} texts...")
-        new_embeddings = self.model.encode(texts, show_progress_bar=True)
-        
-        # Add to existing data
-        self.embeddings.extend(new_embeddings)
-        if metadatas:
-            self.metadata.extend(metadatas)
+        if pool is not None:
+            new_embeddings = self._encode_parallel(texts, batch_size, pool)
+        elif len(texts) > self.parallel_threshold:
+            with self._start_pool() as executor:
+                new_embeddings = self._encode_parallel(texts, batch_size, executor)
         else:
-            self.metadata.extend([{"index": i} for i in range(len(texts))])
+            new_embeddings = self.model.encode(
+                texts, batch_size=batch_size, show_progress_bar=True, normalize_embeddings=True
+            )
         
-        # Save to disk
-        self._save_data()
+        # Append to disk
+        new_embeddings = new_embeddings.astype(np.float32, copy=False)
+        if not metadatas:
+            metadatas = [{"index": i} for i in range(len(texts))]
+        start = self.total_chunks
+        try:
+            self._append_embeddings(new_embeddings, metadatas)
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return
+        self._add_to_index(new_embeddings, start)
         print(f"Added {len(texts)} texts to vector store")
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query with the sentence transformer model.
+        
+        Args:
+            query: Query text
+            
+        Returns:
+            L2-normalized query embedding
+        """
+        return self.model.encode([query], normalize_embeddings=True).astype(np.float32, copy=False)[0]
+    
+    def search(self, query: str, n_results: int = 5,
+               query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Search for similar texts.
         
         Args:
             query: Search query
             n_results: Number of results to return
+            query_embedding: Precomputed normalized embedding of the query
             
         Returns:
             List of dictionaries with 'content' and 'metadata' keys
         """
-        if not self.embeddings:
-            return []
+        query_embeddings = None if query_embedding is None else query_embedding[np.newaxis, :]
+        return self.search_many([query], n_results, query_embeddings=query_embeddings)[0]
+    
+    def search_many(self, queries: List[str], n_results: int = 5, batch_size: int = 32,
+                    query_embeddings: Optional[np.ndarray] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar texts for several queries at once.
+        
+        All queries are encoded in one batched model call, then looked up in
+        the HNSW index or, without one, scored with a single matrix
+        multiplication against the stored embeddings.
+        
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            batch_size: Number of queries encoded per forward pass
+            query_embeddings: Precomputed normalized query embeddings, one row per query
+            
+        Returns:
+            One list of result dictionaries per query
+        """
+        if self.total_chunks == 0 or not queries:
+            return [[] for _ in queries]
         
-        # Encode query
-        query_embedding = self.model.encode([query])
+        # Encode all queries in one batch
+        if query_embeddings is None:
+            query_embeddings = self.model.encode(
+                queries, batch_size=batch_size, normalize_embeddings=True
+            )
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
         
-        # Calculate similarities
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
+        if self.use_hnsw:
+            index = self._get_index()
+            k = min(n_results, self.total_chunks)
+            index.set_ef(max(k * 4, 64))
+            labels, distances = index.knn_query(query_embeddings, k=k)
+            # Cosine distance is 1 - cosine similarity
+            return [
+                self._format_results(row_labels, 1 - row_distances)
+                for row_labels, row_distances in zip(labels, distances)
+            ]
         
-        # Get top results
-        top_indices = np.argsort(similarities)[::-1][:n_results]
+        # A single query against float32 rows runs the fused numba kernel;
+        # batches are better served by one SGEMM
+        if njit is not None and len(query_embeddings) == 1 and n_results > 0 and not self.use_int8:
+            k = min(n_results, self.total_chunks)
+            top_indices, top_scores = _topk_cosine(np.asarray(self.embeddings), query_embeddings[0], k)
+            return [self._format_results(top_indices, top_scores)]
         
-        results = []
-        for idx in top_indices:
-            results.append({
+        # Rows are normalized, so the dot product is the cosine similarity
+        similarities = self._similarities(query_embeddings)
+        
+        # Get top results for every query at once
+        top_indices = self._top_k(similarities, n_results)
+        top_scores = np.take_along_axis(similarities, top_indices, axis=-1)
+        return [
+            self._format_results(row_indices, row_scores)
+            for row_indices, row_scores in zip(top_indices, top_scores)
+        ]
+    
+    def _format_results(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Build result dictionaries for the given row indices and similarity scores."""
+        return [
+            {
                 'content': self.metadata[idx].get('content', ''),
                 'metadata': {k: v for k, v in self.metadata[idx].items() if k != 'content'},
-                'similarity': float(similarities[idx])
-            })
+                'similarity': score
+            }
+            for idx, score in zip(indices.tolist(), scores.tolist())
+        ]
+    
+    async def asearch(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search asynchronously, coalescing concurrent queries into one batch.
         
-        return results
+        Queries arriving within ``batch_window`` seconds of each other share a
+        single search_many() call.
+        
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            
+        Returns:
+            List of dictionaries with 'content' and 'metadata' keys
+        """
+        loop = asyncio.get_running_loop()
+        if self._search_loop is not loop:
+            # A task left on a previous loop can't run anymore; drop it
+            if self._search_task is not None and not self._search_loop.is_closed():
+                self._search_loop.call_soon_threadsafe(self._search_task.cancel)
+            self._search_queue = asyncio.Queue()
+            self._search_loop = loop
+            self._search_task = loop.create_task(self._drain_search_queue(self._search_queue))
+        
+        future = loop.create_future()
+        await self._search_queue.put((query, n_results, future))
+        return await future
+    
+    async def aclose(self):
+        """Stop the task that batches asearch() calls on the running loop."""
+        task = self._search_task
+        if task is None:
+            return
+        self._search_task = None
+        self._search_queue = None
+        self._search_loop = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    async def _drain_search_queue(self, queue: asyncio.Queue):
+        """Collect pending asearch() calls and answer them in batches."""
+        while True:
+            pending = [await queue.get()]
+            await asyncio.sleep(self.batch_window)
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            
+            queries = [query for query, _, _ in pending]
+            n_results = max(n for _, n, _ in pending)
+            try:
+                batch_results = await asyncio.to_thread(self.search_many, queries, n_results)
+            except Exception as e:
+                for _, _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, n, future), results in zip(pending, batch_results):
+                if not future.done():
+                    future.set_result(results[:n])
     
     def clear_collection(self):
         """Clear all data from the vector store."""
-        self.embeddings = []
+        self._emb = None
+        self._len = 0
+        self._int8 = None
+        self._index = None
+        self._index_dirty = False
         self.metadata = []
-        if os.path.exists(self.embeddings_file):
-            os.remove(self.embeddings_file)
-        if os.path.exists(self.metadata_file):
-            os.remove(self.metadata_file)
+        for path in (self.embeddings_file, self.length_file, self.metadata_file, self.index_file,
+                     self.npy_embeddings_file, self.legacy_embeddings_file, self.legacy_metadata_file):
+            if os.path.exists(path):
+                os.remove(path)
         print("Vector store cleared")
     
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the vector store."""
         return {
-            "total_chunks": len(self.embeddings),
-            "embedding_dimension": self.embeddings[0].shape[0] if self.embeddings else 0,
+            "total_chunks": self.total_chunks,
+            "embedding_dimension": self.dimension if self.total_chunks else 0,
             "store_directory": self.store_dir
         } 
\ No newline at end of file
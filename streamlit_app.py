@@ -1,5 +1,7 @@
 import streamlit as st
 import os
+import queue
+from typing import Optional
 from rag_chatbot_fallback import RAGChatbotFallback
 from dotenv import load_dotenv
 
@@ -45,7 +47,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def initialize_chatbot():
+@st.cache_resource(show_spinner="Loading model...")
+def load_chatbot(transcripts_dir: str) -> RAGChatbotFallback:
+    """Create the chatbot once and share it across reruns and sessions."""
+    return RAGChatbotFallback(transcripts_dir)
+
+@st.cache_data(ttl=60)
+def load_stats(_chatbot: RAGChatbotFallback, transcripts_dir: str):
+    """Get transcript and vector store statistics, refreshed at most once a minute."""
+    return _chatbot.get_transcript_summary(), _chatbot.get_vector_store_info()
+
+def initialize_chatbot() -> Optional[RAGChatbotFallback]:
     """Initialize the RAG chatbot."""
     # Use environment variable for transcripts directory, with fallback for local development
     transcripts_dir = os.getenv("TRANSCRIPTS_DIR", "./transcripts")
@@ -57,12 +69,23 @@ def initialize_chatbot():
         return None
     
     try:
-        chatbot = RAGChatbotFallback(transcripts_dir)
-        return chatbot
+        # Exceptions aren't cached, so a failed load is retried on the next rerun
+        return load_chatbot(transcripts_dir)
     except Exception as e:
         st.error(f"Error initializing chatbot: {str(e)}")
         return None
 
+def run_setup(chatbot: RAGChatbotFallback, label: str, force_rebuild: bool = False) -> None:
+    """Run vector store setup on a background thread, streaming its progress."""
+    thread, progress = chatbot.start_setup(force_rebuild=force_rebuild)
+    with st.status(label, expanded=True) as status:
+        while thread.is_alive() or not progress.empty():
+            try:
+                status.write(progress.get(timeout=0.5))
+            except queue.Empty:
+                pass
+        status.update(label="Done", state="complete", expanded=False)
+
 def main():
     """Main application function."""
     
@@ -101,19 +124,20 @@ def main():
         # Vector store setup
         st.markdown("### Vector Store")
         if st.button("Setup Vector Store"):
-            with st.spinner("Setting up vector store..."):
-                chatbot.setup_vector_store()
+            run_setup(chatbot, "Setting up vector store...")
+            load_stats.clear()
             st.success("Vector store setup complete!")
         
         if st.button("Rebuild Vector Store"):
-            with st.spinner("Rebuilding vector store..."):
-                chatbot.setup_vector_store(force_rebuild=True)
+            run_setup(chatbot, "Rebuilding vector store...", force_rebuild=True)
+            load_stats.clear()
             st.success("Vector store rebuilt!")
         
         # Display info
         try:
-            transcript_summary = chatbot.get_transcript_summary()
-            vector_info = chatbot.get_vector_store_info()
+            transcript_summary, vector_info = load_stats(
+                chatbot, os.getenv("TRANSCRIPTS_DIR", "./transcripts")
+            )
             
             st.markdown("### Statistics")
             st.metric("Total Transcripts", transcript_summary.get("total_transcripts", 0))
@@ -150,24 +174,24 @@ def main():
         
         # Generate response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    response = chatbot.chat(prompt, n_context_results)
-                    
-                    # Display response
-                    st.markdown(response["response"])
-                    
-                    # Add assistant response to chat history
-                    st.session_state.messages.append({"role": "assistant", "content": response["response"]})
+            try:
+                with st.spinner("Thinking..."):
+                    response = chatbot.chat_stream(prompt, n_context_results)
+                
+                # Display response as it streams in
+                response_text = st.write_stream(response["response"])
+                
+                # Add assistant response to chat history
+                st.session_state.messages.append({"role": "assistant", "content": response_text})
+                
+                # Show context used (expandable)
+                with st.expander("View Context Used"):
+                    st.text(response["context_used"])
                     
-                    # Show context used (expandable)
-                    with st.expander("View Context Used"):
-                        st.text(response["context_used"])
-                        
-                except Exception as e:
-                    error_msg = f"Error generating response: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+            except Exception as e:
+                error_msg = f"Error generating response: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
     
     # Example questions
     if not st.session_state.messages:
@@ -5,6 +5,7 @@ Test script for the Stanford ETL RAG Chatbot.
 
 import os
 import sys
+import asyncio
 from rag_chatbot import RAGChatbot
 from dotenv import load_dotenv
 
@@ -54,7 +55,7 @@ def test_chatbot():
         
         if vector_info.get('total_chunks', 0) == 0:
             print("⚠️  Vector store is empty. Setting up...")
-            chatbot.setup_vector_store()
+            asyncio.run(chatbot.asetup_vector_store())
             vector_info = chatbot.get_vector_store_info()
             print(f"✅ Vector store now contains {vector_info.get('total_chunks', 0)} chunks")
     except Exception as e:
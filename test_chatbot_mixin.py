@@ -0,0 +1,71 @@
+import queue
+import threading
+import contextlib
+from chatbot_mixin import ChatbotMixin
+
+class BlockingSetup(ChatbotMixin):
+    """Chatbot whose setup runs until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.runs = []
+
+    def setup_vector_store(self, force_rebuild=False, progress=None):
+        self.runs.append(force_rebuild)
+        self.release.wait(5)
+
+def test_second_setup_joins_the_running_one():
+    chatbot = BlockingSetup()
+    thread, progress = chatbot.start_setup()
+    same_thread, same_progress = chatbot.start_setup(force_rebuild=True)
+    assert same_thread is thread and same_progress is progress
+
+    chatbot.release.set()
+    thread.join()
+    assert chatbot.runs == [False]
+
+def test_new_setup_starts_after_the_last_one_finished():
+    chatbot = BlockingSetup()
+    chatbot.release.set()
+    first, _ = chatbot.start_setup()
+    first.join()
+
+    second, _ = chatbot.start_setup(force_rebuild=True)
+    second.join()
+    assert second is not first
+    assert chatbot.runs == [False, True]
+
+class RecordingStore:
+    """Vector store that records the calls setup makes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_collection_info(self):
+        return {"total_chunks": 0}
+
+    def encoding_pool(self, total_chars):
+        return contextlib.nullcontext()
+
+    def add_transcripts(self, transcripts, pool=None):
+        self.calls.append(("add", len(transcripts)))
+
+    def close(self):
+        self.calls.append(("close",))
+
+class Loader:
+    def get_total_size(self):
+        return 0
+
+    def iter_transcripts(self):
+        return iter([{"title": str(i)} for i in range(3)])
+
+class StoreSetup(ChatbotMixin):
+    def __init__(self):
+        self.vector_store = RecordingStore()
+        self.transcript_loader = Loader()
+
+def test_setup_closes_the_store_after_the_last_batch():
+    chatbot = StoreSetup()
+    chatbot.setup_vector_store(progress=queue.Queue(), transcripts_per_batch=2)
+    assert chatbot.vector_store.calls == [("add", 2), ("add", 1), ("close",)]
@@ -0,0 +1,60 @@
+import random
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+import vector_store
+from vector_store import VectorStore
+
+def reference_chunks(text, chunk_size, overlap):
+    """The original per-character chunking loop."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            search_start = max(start, end - 100)
+            for i in range(end, search_start, -1):
+                if text[i-1] in '.!?':
+                    end = i
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end - overlap
+        if start >= len(text):
+            break
+    return chunks
+
+def random_text(rng, n_words, alphabet="abcdefgh"):
+    words = []
+    for _ in range(n_words):
+        word = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12)))
+        words.append(word + rng.choice(["", "", "", ".", "!", "?", ","]))
+    return " ".join(words)
+
+def chunks_from_offsets(text, offsets):
+    chunks = (text[start:end].strip() for start, end in offsets)
+    return [chunk for chunk in chunks if chunk]
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("chunk_size,overlap", [(1000, 200), (300, 50)])
+def test_python_offsets_match_reference(monkeypatch, seed, chunk_size, overlap):
+    monkeypatch.setattr(vector_store, "njit", None)
+    text = random_text(random.Random(seed), 2000)
+    offsets = VectorStore._chunk_offsets(text, chunk_size, overlap)
+    assert chunks_from_offsets(text, offsets) == reference_chunks(text, chunk_size, overlap)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compiled_offsets_match_python(monkeypatch, seed):
+    if vector_store.njit is None:
+        pytest.skip("numba not installed")
+    text = random_text(random.Random(seed), 2000)
+    compiled = VectorStore._chunk_offsets(text, 1000, 200)
+    monkeypatch.setattr(vector_store, "njit", None)
+    assert compiled == VectorStore._chunk_offsets(text, 1000, 200)
+
+def test_non_ascii_text_matches_reference():
+    text = random_text(random.Random(0), 2000, alphabet="abcé日本")
+    offsets = VectorStore._chunk_offsets(text, 1000, 200)
+    assert chunks_from_offsets(text, offsets) == reference_chunks(text, 1000, 200)
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("tiktoken")
+from context_utils import dedupe_results, fit_to_token_budget
+
+class WordEncoding:
+    """Stand-in tokenizer that counts one token per word."""
+
+    def encode(self, text):
+        return text.split()
+
+def result(content):
+    return {"content": content, "metadata": {}}
+
+def test_dedupe_drops_near_duplicates():
+    base = "the founders spent two years talking to customers before writing any code at all"
+    results = [
+        result(base),
+        result(base + " today"),
+        result("venture capital firms look for large markets and strong teams"),
+    ]
+    kept = dedupe_results(results, 5)
+    assert [r["content"] for r in kept] == [base, results[2]["content"]]
+
+def test_dedupe_stops_at_n_results():
+    results = [result(f"distinct chunk number {i} about topic {i}") for i in range(10)]
+    assert dedupe_results(results, 3) == results[:3]
+
+def test_fit_to_token_budget_keeps_prefix():
+    parts = ["one two", "three four five", "six"]
+    assert fit_to_token_budget(parts, 5, WordEncoding()) == parts[:2]
+    assert fit_to_token_budget(parts, 1, WordEncoding()) == []
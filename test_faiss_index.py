@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+from faiss_index import FaissIndex
+
+def random_embeddings(n, dim=64, seed=0):
+    embeddings = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+def ids(start, stop):
+    return [f"chunk_{i}" for i in range(start, stop)]
+
+def test_round_trip_before_and_after_training(tmp_path):
+    embeddings = random_embeddings(2000)
+    index = FaissIndex(str(tmp_path), n_subquantizers=8, min_train_size=1000)
+    index.add(ids(0, 500), embeddings[:500])
+    assert index.index is None
+    assert FaissIndex(str(tmp_path), n_subquantizers=8).search(embeddings[3], 1) == ["chunk_3"]
+
+    index.add(ids(500, 2000), embeddings[500:])
+    assert index.index is not None
+
+    reloaded = FaissIndex(str(tmp_path), n_subquantizers=8)
+    assert len(reloaded) == 2000
+    assert "chunk_3" in reloaded.search(embeddings[3], 10)
+
+def test_adds_after_training_are_written_by_save(tmp_path):
+    embeddings = random_embeddings(1500)
+    index = FaissIndex(str(tmp_path), n_subquantizers=8, min_train_size=1000)
+    index.add(ids(0, 1000), embeddings[:1000])
+    # Training saves the index and drops the pending files it replaces
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["faiss_meta.json", "faiss_opq.npz"]
+
+    index.add(ids(1000, 1500), embeddings[1000:])
+    assert len(FaissIndex(str(tmp_path), n_subquantizers=8)) == 1000
+
+    index.save()
+    reloaded = FaissIndex(str(tmp_path), n_subquantizers=8)
+    assert len(reloaded) == 1500
+    assert reloaded.ids == ids(0, 1500)
+    assert "chunk_1200" in reloaded.search(embeddings[1200], 10)
+
+def test_unreadable_index_is_discarded(tmp_path):
+    index = FaissIndex(str(tmp_path))
+    index.add(ids(0, 10), random_embeddings(10))
+    with open(index.ids_file, 'a') as f:
+        f.write("not json\n")
+
+    assert len(FaissIndex(str(tmp_path))) == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,66 @@
+import builtins
+import numpy as np
+import flat_index
+from flat_index import FlatIndex
+
+def random_embeddings(n, dim=384, seed=0):
+    embeddings = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+def ids(start, stop):
+    return [f"chunk_{i}" for i in range(start, stop)]
+
+def test_round_trip(tmp_path):
+    embeddings = random_embeddings(300)
+    index = FlatIndex(str(tmp_path))
+    index.add(ids(0, 100), embeddings[:100])
+    index.add(ids(100, 300), embeddings[100:])
+
+    reloaded = FlatIndex(str(tmp_path))
+    assert len(reloaded) == 300
+    assert reloaded.search(embeddings[42], 5)[0] == "chunk_42"
+    assert reloaded.search(embeddings[42], 5) == index.search(embeddings[42], 5)
+
+def test_partial_append_is_dropped(tmp_path):
+    embeddings = random_embeddings(1010)
+    index = FlatIndex(str(tmp_path))
+    index.add(ids(0, 1000), embeddings[:1000])
+
+    # Simulate a crash after rows were written but before their ids
+    with open(index.embeddings_file, 'ab') as f:
+        f.write(embeddings[1000:].astype(np.float16).tobytes())
+
+    reloaded = FlatIndex(str(tmp_path))
+    assert len(reloaded) == 1000
+    assert reloaded.search(embeddings[7], 1) == ["chunk_7"]
+
+    # Later appends line up with their ids again
+    reloaded.add(["new"], embeddings[1005:1006])
+    assert FlatIndex(str(tmp_path)).search(embeddings[1005], 1) == ["new"]
+
+def test_failed_append_is_rolled_back(tmp_path, monkeypatch):
+    embeddings = random_embeddings(120)
+    index = FlatIndex(str(tmp_path))
+    index.add(ids(0, 100), embeddings[:100])
+
+    def failing_open(path, mode='r', *args, **kwargs):
+        if path == index.ids_file:
+            raise OSError("disk full")
+        return builtins.open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(flat_index, "open", failing_open, raising=False)
+    index.add(ids(100, 120), embeddings[100:])
+    monkeypatch.undo()
+
+    assert len(index) == 100
+    index.add(["new"], embeddings[110:111])
+    reloaded = FlatIndex(str(tmp_path))
+    assert len(reloaded) == 101
+    assert reloaded.search(embeddings[110], 1) == ["new"]
+
+def test_clear(tmp_path):
+    index = FlatIndex(str(tmp_path))
+    index.add(ids(0, 10), random_embeddings(10))
+    index.clear()
+    assert len(FlatIndex(str(tmp_path))) == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,27 @@
+import time
+import asyncio
+from rate_limiter import RateLimiter
+
+def test_full_bucket_does_not_wait():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=60000)
+    start = time.monotonic()
+    asyncio.run(limiter.acquire(1000))
+    assert time.monotonic() - start < 0.05
+    assert limiter.available_tokens <= 59000 + 1
+
+def test_waits_for_requests_to_refill():
+    # 600 requests per minute refill one every 0.1 s
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**9)
+
+    async def run():
+        for _ in range(600):
+            await limiter.acquire(1)
+        start = time.monotonic()
+        await limiter.acquire(1)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.05
+
+def test_oversized_request_is_capped():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1000)
+    asyncio.run(asyncio.wait_for(limiter.acquire(10**6), timeout=1))
@@ -0,0 +1,58 @@
+import numpy as np
+from semantic_cache import SemanticCache
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def result(query, n=5):
+    return {"query": query, "response": f"answer to {query}", "context_used": "", "context_chunks": n}
+
+def test_hit_and_miss(tmp_path):
+    cache = SemanticCache(str(tmp_path / "cache.pkl"), threshold=0.95)
+    cache.put(unit([1, 0, 0]), result("a"))
+
+    assert cache.get(unit([1, 0.1, 0]), 5)["query"] == "a"
+    assert cache.get(unit([0, 1, 0]), 5) is None
+    # A different number of context chunks is a different answer
+    assert cache.get(unit([1, 0, 0]), 3) is None
+
+def test_persists_across_instances(tmp_path):
+    cache_file = str(tmp_path / "cache.pkl")
+    SemanticCache(cache_file).put(unit([1, 0, 0]), result("a"))
+    assert SemanticCache(cache_file).get(unit([1, 0, 0]), 5)["query"] == "a"
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("semantic_cache.time.time", lambda: now[0])
+    cache = SemanticCache(str(tmp_path / "cache.pkl"), ttl_seconds=10)
+    cache.put(unit([1, 0, 0]), result("a"))
+
+    now[0] += 5
+    assert cache.get(unit([1, 0, 0]), 5) is not None
+    now[0] += 10
+    assert cache.get(unit([1, 0, 0]), 5) is None
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("semantic_cache.time.time", lambda: now[0])
+    cache = SemanticCache(str(tmp_path / "cache.pkl"), max_entries=2)
+    cache.put(unit([1, 0, 0]), result("a"))
+    now[0] += 1
+    cache.put(unit([0, 1, 0]), result("b"))
+    now[0] += 1
+    cache.get(unit([1, 0, 0]), 5)
+    now[0] += 1
+    cache.put(unit([0, 0, 1]), result("c"))
+
+    assert cache.get(unit([1, 0, 0]), 5) is not None
+    assert cache.get(unit([0, 1, 0]), 5) is None
+    assert cache.get(unit([0, 0, 1]), 5) is not None
+
+def test_skips_closer_entry_with_other_context_size(tmp_path):
+    cache = SemanticCache(str(tmp_path / "cache.pkl"), threshold=0.95)
+    cache.put(unit([1, 0, 0]), result("three", n=3))
+    cache.put(unit([1, 0.05, 0]), result("five", n=5))
+
+    assert cache.get(unit([1, 0, 0]), 5)["query"] == "five"
+    assert cache.get(unit([1, 0, 0]), 3)["query"] == "three"
@@ -0,0 +1,167 @@
+import os
+import json
+import zlib
+import asyncio
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+import simple_vector_store
+from simple_vector_store import SimpleVectorStore
+
+DIM = 16
+
+class FakeModel:
+    """Deterministic stand-in for the sentence transformer."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, **kwargs):
+        embeddings = np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM)
+            for text in texts
+        ]).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    monkeypatch.setattr(simple_vector_store, "SentenceTransformer", FakeModel)
+
+def texts(n, prefix="text"):
+    return [f"{prefix} {i}" for i in range(n)]
+
+def add(store, items):
+    store.add_texts(items, [{"content": text} for text in items])
+
+def test_append_and_reload(tmp_path):
+    store = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    add(store, texts(50))
+    add(store, texts(30, "more"))
+
+    reloaded = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    assert reloaded.total_chunks == 80
+    assert reloaded.search("more 7", 1)[0]['content'] == "more 7"
+    assert reloaded.search("text 3", 1)[0]['content'] == "text 3"
+
+def test_loaded_store_is_mapped_read_only_until_appended(tmp_path):
+    add(SimpleVectorStore(str(tmp_path), use_hnsw=False), texts(10))
+
+    store = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    assert store._emb.mode == 'r'
+    add(store, texts(5, "new"))
+    assert store._emb.mode == 'r+'
+    assert SimpleVectorStore(str(tmp_path), use_hnsw=False).total_chunks == 15
+
+def test_uncommitted_append_is_dropped(tmp_path):
+    add(SimpleVectorStore(str(tmp_path), use_hnsw=False), texts(10))
+    with open(os.path.join(str(tmp_path), "metadata.jsonl"), 'a') as f:
+        f.write(json.dumps({"content": "orphan"}) + "\n")
+
+    store = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    assert store.total_chunks == 10
+    add(store, ["new one"])
+    assert SimpleVectorStore(str(tmp_path), use_hnsw=False).metadata[-1]['content'] == "new one"
+
+def test_load_failure_clears_the_store(tmp_path):
+    add(SimpleVectorStore(str(tmp_path), use_hnsw=False), texts(3))
+    os.remove(os.path.join(str(tmp_path), "embeddings.f32"))
+
+    store = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    assert store.total_chunks == 0
+    add(store, ["new one"])
+
+    reloaded = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    assert reloaded.total_chunks == 1
+    assert reloaded.metadata == [{"content": "new one"}]
+
+def test_migrates_legacy_layout(tmp_path):
+    embeddings = FakeModel().encode(texts(5), normalize_embeddings=True)
+    np.save(os.path.join(str(tmp_path), "embeddings.npy"), embeddings)
+    with open(os.path.join(str(tmp_path), "metadata.json"), 'w') as f:
+        json.dump([{"content": text} for text in texts(5)], f)
+
+    store = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    assert store.total_chunks == 5
+    assert store.search("text 2", 1)[0]['content'] == "text 2"
+    assert not os.path.exists(os.path.join(str(tmp_path), "metadata.json"))
+    assert SimpleVectorStore(str(tmp_path), use_hnsw=False).total_chunks == 5
+
+def test_int8_scan_matches_float(tmp_path):
+    add(SimpleVectorStore(str(tmp_path), use_hnsw=False), texts(200))
+    exact = SimpleVectorStore(str(tmp_path), use_hnsw=False)
+    quantized = SimpleVectorStore(str(tmp_path), use_hnsw=False, use_int8=True)
+
+    queries = texts(20)
+    for exact_results, int8_results in zip(exact.search_many(queries, 3), quantized.search_many(queries, 3)):
+        assert int8_results[0]['content'] == exact_results[0]['content']
+
+def test_int8_with_hnsw_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SimpleVectorStore(str(tmp_path), use_int8=True)
+
+def test_top_k_is_sorted_and_exact():
+    similarities = np.random.default_rng(0).standard_normal((3, 1000)).astype(np.float32)
+    top = SimpleVectorStore._top_k(similarities, 10)
+    expected = np.argsort(-similarities, axis=1)[:, :10]
+    np.testing.assert_array_equal(top, expected)
+
+def test_fused_kernel_matches_matmul():
+    if simple_vector_store.njit is None:
+        pytest.skip("numba not installed")
+    embeddings = FakeModel().encode(texts(5000), normalize_embeddings=True)
+    query = embeddings[123]
+    indices, scores = simple_vector_store._topk_cosine(embeddings, query, 5)
+
+    similarities = embeddings @ query
+    expected = np.argsort(-similarities)[:5]
+    np.testing.assert_array_equal(indices, expected)
+    np.testing.assert_allclose(scores, similarities[expected], rtol=1e-5)
+
+def test_hnsw_index_is_saved_on_close(tmp_path):
+    if simple_vector_store.hnswlib is None:
+        pytest.skip("hnswlib not installed")
+    store = SimpleVectorStore(str(tmp_path))
+    add(store, texts(100))
+    assert store.search("text 5", 1)[0]['content'] == "text 5"
+
+    # Adds after the index is built only update it in memory until close()
+    index_file = os.path.join(str(tmp_path), "hnsw_index.bin")
+    saved_size = os.path.getsize(index_file)
+    add(store, texts(10, "late"))
+    assert os.path.getsize(index_file) == saved_size
+    store.close()
+
+    reloaded = SimpleVectorStore(str(tmp_path))
+    assert reloaded._get_index().get_current_count() == 110
+    assert reloaded.search("late 3", 1)[0]['content'] == "late 3"
+
+def test_asearch_coalesces_concurrent_queries(tmp_path, monkeypatch):
+    store = SimpleVectorStore(str(tmp_path), use_hnsw=False, batch_window=0.05)
+    add(store, texts(20))
+
+    calls = []
+    search_many = store.search_many
+    def counting_search_many(queries, n_results):
+        calls.append(list(queries))
+        return search_many(queries, n_results)
+    monkeypatch.setattr(store, "search_many", counting_search_many)
+
+    async def run():
+        try:
+            return await asyncio.gather(*[store.asearch(f"text {i}", 1) for i in range(3)])
+        finally:
+            await store.aclose()
+
+    results = asyncio.run(run())
+    assert [r[0]['content'] for r in results] == ["text 0", "text 1", "text 2"]
+    assert len(calls) == 1
+
+    # A fresh event loop gets a fresh batching task
+    assert asyncio.run(run())[1][0]['content'] == "text 1"
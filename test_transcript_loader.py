@@ -0,0 +1,61 @@
+import os
+import time
+import threading
+from transcript_loader import TranscriptLoader
+
+def write_transcripts(directory, n):
+    for i in range(n):
+        (directory / f"Talk {i:02d}.txt").write_text(f"Talk number {i}. " * 50)
+
+def test_load_all_transcripts_reads_each_file_once(tmp_path, monkeypatch):
+    write_transcripts(tmp_path, 5)
+    loader = TranscriptLoader(str(tmp_path))
+    reads = []
+    load_transcript = loader.load_transcript
+    monkeypatch.setattr(loader, "load_transcript", lambda path: reads.append(path) or load_transcript(path))
+
+    assert len(loader.load_all_transcripts()) == 5
+    assert len(loader.load_all_transcripts()) == 5
+    assert len(reads) == 5
+
+def test_changed_and_deleted_files_are_noticed(tmp_path):
+    write_transcripts(tmp_path, 3)
+    loader = TranscriptLoader(str(tmp_path))
+    loader.load_all_transcripts()
+
+    changed = tmp_path / "Talk 00.txt"
+    changed.write_text("A different talk entirely.")
+    # Make sure the modification time moves even on coarse-grained filesystems
+    stat = changed.stat()
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.remove(tmp_path / "Talk 02.txt")
+
+    transcripts = {t['title']: t for t in loader.load_all_transcripts()}
+    assert set(transcripts) == {"Talk 00", "Talk 01"}
+    assert transcripts["Talk 00"]['content'] == "A different talk entirely."
+
+def test_summary_totals(tmp_path):
+    write_transcripts(tmp_path, 4)
+    summary = TranscriptLoader(str(tmp_path)).get_transcript_summary()
+    assert summary["total_transcripts"] == 4
+    assert summary["total_size"] == sum(p.stat().st_size for p in tmp_path.iterdir())
+
+def test_iter_transcripts_yields_every_file(tmp_path):
+    write_transcripts(tmp_path, 30)
+    titles = sorted(t['title'] for t in TranscriptLoader(str(tmp_path)).iter_transcripts())
+    assert titles == [f"Talk {i:02d}" for i in range(30)]
+
+def test_iter_transcripts_stops_reader_when_closed_early(tmp_path):
+    write_transcripts(tmp_path, 60)
+    before = threading.active_count()
+
+    transcripts = TranscriptLoader(str(tmp_path)).iter_transcripts(queue_size=2)
+    next(transcripts)
+    # Let the reader fill the queue and block on it
+    time.sleep(0.2)
+    transcripts.close()
+
+    deadline = time.monotonic() + 5
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() == before
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+from vector_store import VectorStore
+
+def chunk_batches(n, fail_after=None):
+    for i in range(n):
+        if i == fail_after:
+            raise RuntimeError("chunking failed")
+        yield [f"chunk {i}"], [{}], [str(i)]
+
+def make_store(batches, flush):
+    # Only the ingest pipeline is exercised, so skip loading Chroma and the model
+    store = VectorStore.__new__(VectorStore)
+    store._iter_chunk_batches = lambda transcripts, flush_size: batches
+    store._flush = flush
+    return store
+
+async def other_tasks():
+    # Give cancelled tasks a few loop iterations to finish
+    for _ in range(10):
+        await asyncio.sleep(0)
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+def test_failed_flush_stops_the_producer():
+    def flush(chunks, metadatas, ids, pool):
+        raise RuntimeError("upsert failed")
+    store = make_store(chunk_batches(100), flush)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="upsert failed"):
+            await store.aadd_transcripts([], queue_size=2, pool=object())
+        return await other_tasks()
+
+    assert asyncio.run(run()) == []
+
+def test_chunking_error_is_raised_after_earlier_batches_are_added():
+    flushed = []
+    store = make_store(chunk_batches(5, fail_after=3), lambda chunks, metadatas, ids, pool: flushed.extend(ids))
+
+    async def run():
+        with pytest.raises(RuntimeError, match="chunking failed"):
+            await store.aadd_transcripts([], queue_size=2, pool=object())
+        return await other_tasks()
+
+    assert asyncio.run(run()) == []
+    assert flushed == ["0", "1", "2"]
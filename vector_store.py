@@ -1,38 +1,211 @@
 import os
+import asyncio
+import hashlib
+import functools
+import multiprocessing
+from contextlib import contextmanager, ExitStack
+from itertools import repeat
+from collections import OrderedDict
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+import torch
 from sentence_transformers import SentenceTransformer
 import numpy as np
+from binary_index import BinaryIndex
+from flat_index import FlatIndex
+from encode_workers import init_encode_worker, encode_shard, worker_count
+
+# faiss is optional and only needed for the "faiss_opq" backend
+try:
+    from faiss_index import FaissIndex
+except ImportError:
+    FaissIndex = None
+
+# The int8 ONNX embedder is optional; without onnxruntime we stay on PyTorch
+try:
+    from onnx_embedder import OnnxEmbedder
+except ImportError:
+    OnnxEmbedder = None
+
+# xxhash is optional; without it chunk hashing falls back to hashlib
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# numba is optional; without it chunk boundaries are found with str.rfind
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _chunk_offsets_jit(codepoints, chunk_size, overlap):
+        """
+        Compiled chunk boundary search over a text's character codes.
+        
+        Mirrors VectorStore._chunk_offsets and returns an (M, 2) array of
+        (start, end) offsets.
+        """
+        n = len(codepoints)
+        offsets = np.empty((16, 2), dtype=np.int64)
+        count = 0
+        start = 0
+        
+        while start < n:
+            end = start + chunk_size
+            
+            # If this isn't the last chunk, try to break at a sentence boundary
+            if end < n:
+                search_start = max(start, end - 100)
+                for i in range(end, search_start, -1):
+                    c = codepoints[i - 1]
+                    if c == 46 or c == 33 or c == 63:  # '.', '!', '?'
+                        end = i
+                        break
+            
+            if count == len(offsets):
+                grown = np.empty((2 * count, 2), dtype=np.int64)
+                grown[:count] = offsets
+                offsets = grown
+            offsets[count, 0] = start
+            offsets[count, 1] = end
+            count += 1
+            
+            start = end - overlap
+            if start >= n:
+                break
+        
+        return offsets[:count]
+
+def _hash_chunk(text: str):
+    """Hash chunk text for embedding deduplication."""
+    data = text.encode('utf-8')
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+# Embeddings are L2-normalized, so cosine is the natural metric. These
+# settings only apply when a collection is created; an existing collection
+# keeps its metric until it is rebuilt.
+COLLECTION_METADATA = {
+    "description": "Stanford ETL Transcripts Vector Database",
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 128
+}
+
+# Search backends: Chroma's HNSW index, or a side index whose candidates are
+# reranked with the full embeddings stored in Chroma. Chroma keeps its fp32
+# embeddings and HNSW graph either way, so a side index adds to the store's
+# memory and disk use rather than reducing it; it changes how the shortlist
+# is found. "flat_f16" is an exact exhaustive scan of a float16 memmap, so
+# recall doesn't depend on HNSW's search_ef; "binary" is a sign-bit Hamming
+# scan over 48 bytes per embedding; "faiss_opq" is a FAISS OPQ48,IVF<k>,PQ48
+# index (48 bytes per embedding) that scans only n_probe of its k (about
+# 4 * sqrt(N)) lists, trained once 10k embeddings are added.
+INDEX_CLASSES = {"binary": BinaryIndex, "flat_f16": FlatIndex, "faiss_opq": FaissIndex}
+BACKENDS = ("chroma",) + tuple(INDEX_CLASSES)
+
+def _load_sentence_transformer(device: str, quantize_int8: bool = False) -> SentenceTransformer:
+    """
+    Load the MiniLM embedding model at the precision suited to the device.
+    
+    Args:
+        device: "cuda" or "cpu"
+        quantize_int8: On CPU, quantize Linear layer weights to int8
+        
+    Returns:
+        The loaded model
+    """
+    model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+    if device == "cuda":
+        # fp16 halves the bytes moved per matmul with no loss in retrieval quality
+        return model.half()
+    if quantize_int8:
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+def _load_worker_model(onnx_model_dir: Optional[str], quantize_int8: bool):
+    """Load the embedding model used by a parallel encoding worker."""
+    if onnx_model_dir:
+        # Like torch in init_encode_worker, each worker's session gets one core
+        return OnnxEmbedder(onnx_model_dir, intra_op_num_threads=1)
+    return _load_sentence_transformer("cpu", quantize_int8)
 
 class VectorStore:
     """Handle vector storage and retrieval for the RAG system."""
     
-    def __init__(self, persist_directory: str = "./chroma_db"):
+    def __init__(self, persist_directory: str = "./chroma_db", onnx_model_dir: Optional[str] = None,
+                 parallel_threshold: int = 10000, backend: Optional[str] = None, rerank_factor: int = 10,
+                 max_cached_embeddings: int = 50000, quantize_int8: bool = False):
         """
         Initialize the vector store.
         
         Args:
             persist_directory: Directory to persist the vector database
+            onnx_model_dir: Directory with an int8 ONNX export of the embedding
+                model (see onnx_embedder.py); defaults to $ONNX_MODEL_DIR
+            parallel_threshold: Estimated chunk count of an ingest above which
+                encoding is spread across worker processes
+            backend: Search backend, one of BACKENDS; defaults to
+                $VECTOR_BACKEND, or "chroma"
+            rerank_factor: Shortlist size per requested result for approximate backends
+            max_cached_embeddings: Number of chunk embeddings kept for reuse
+                when identical chunk text is added again
+            quantize_int8: On CPU, quantize the PyTorch model's Linear layers to
+                int8 (rebuild the vector store after changing this)
         """
+        backend = backend or os.getenv("VECTOR_BACKEND", "chroma")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+        if backend == "faiss_opq" and FaissIndex is None:
+            raise ValueError("The faiss_opq backend requires faiss (pip install faiss-cpu)")
+        
         self.persist_directory = persist_directory
+        self.parallel_threshold = parallel_threshold
+        self.backend = backend
+        self.rerank_factor = rerank_factor
         self.client = chromadb.PersistentClient(
             path=persist_directory,
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize embedding model, preferring the quantized ONNX export when available
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.quantize_int8 = quantize_int8
+        onnx_model_dir = onnx_model_dir or os.getenv("ONNX_MODEL_DIR")
+        if onnx_model_dir and OnnxEmbedder is not None and os.path.isdir(onnx_model_dir):
+            self.onnx_model_dir = onnx_model_dir
+            self.embedding_model = OnnxEmbedder(onnx_model_dir)
+        else:
+            self.onnx_model_dir = None
+            self.embedding_model = _load_sentence_transformer(self.device, quantize_int8)
         
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
             name="stanford_etl_transcripts",
-            metadata={"description": "Stanford ETL Transcripts Vector Database"}
+            metadata=COLLECTION_METADATA
         )
+        
+        self.index = INDEX_CLASSES[backend](persist_directory) if backend in INDEX_CLASSES else None
+        
+        # Chunk embeddings keyed by text hash, least recently used first, so
+        # boilerplate repeated across transcripts is only encoded once
+        self.max_cached_embeddings = max_cached_embeddings
+        self._embedding_cache = OrderedDict()
+        
+        # Query embeddings keyed by normalized query text, so repeated
+        # questions skip the embedding model
+        self._query_embedding_cache = functools.lru_cache(maxsize=1024)(self._encode_query)
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    @staticmethod
+    def _chunk_offsets(text: str, chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
         """
-        Split text into overlapping chunks.
+        Compute the (start, end) offsets of overlapping chunks in one pass.
         
         Args:
             text: Text to chunk
@@ -40,9 +213,17 @@ class VectorStore:
             overlap: Number of characters to overlap between chunks
             
         Returns:
-            List of text chunks
+            List of (start, end) offsets into text
         """
-        chunks = []
+        # For ASCII text, bytes and characters line up one to one, so the
+        # compiled search can run over the encoded bytes (one copy of the
+        # text, viewed as uint8 without another). Wider encodings cost more
+        # to build than the compiled loop saves.
+        if njit is not None and text.isascii():
+            codepoints = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+            return [(start, end) for start, end in _chunk_offsets_jit(codepoints, chunk_size, overlap).tolist()]
+        
+        offsets = []
         start = 0
         
         while start < len(text):
@@ -52,33 +233,163 @@ class VectorStore:
             if end < len(text):
                 # Look for sentence endings within the last 100 characters
                 search_start = max(start, end - 100)
-                for i in range(end, search_start, -1):
-                    if text[i-1] in '.!?':
-                        end = i
-                        break
+                boundary = max(text.rfind(c, search_start, end) for c in '.!?')
+                if boundary != -1:
+                    end = boundary + 1
             
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+            offsets.append((start, end))
             
             start = end - overlap
             if start >= len(text):
                 break
         
-        return chunks
+        return offsets
     
-    def add_transcripts(self, transcripts: List[Dict[str, Any]]) -> None:
+    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """
-        Add transcripts to the vector store.
+        Split text into overlapping chunks.
         
         Args:
-            transcripts: List of transcript dictionaries
+            text: Text to chunk
+            chunk_size: Maximum size of each chunk
+            overlap: Number of characters to overlap between chunks
+            
+        Returns:
+            List of text chunks
         """
-        print("Adding transcripts to vector store...")
+        # Slice each chunk only once, after all boundaries are known
+        chunks = (text[start:end].strip() for start, end in self._chunk_offsets(text, chunk_size, overlap))
+        return [chunk for chunk in chunks if chunk]
+    
+    def _start_pool(self, n_workers: int):
+        """
+        Start a pool of encoding worker processes.
+        
+        Each worker loads its own copy of the embedding model once.
+        """
+        print(f"Encoding chunks across {n_workers} processes...")
+        return multiprocessing.get_context("spawn").Pool(
+            processes=n_workers,
+            initializer=init_encode_worker,
+            initargs=(_load_worker_model, self.onnx_model_dir, self.quantize_int8)
+        )
+    
+    @contextmanager
+    def encoding_pool(self, total_chars: int):
+        """
+        Start an encoding pool for the duration of a large CPU ingest.
+        
+        Starting the workers and loading their models is expensive, so one
+        pool should span a whole ingest rather than each add_transcripts()
+        call; pass it to add_transcripts() as pool.
+        
+        Args:
+            total_chars: Approximate size of all text about to be added
+            
+        Yields:
+            The pool, or None if the ingest is small or runs on a GPU
+        """
+        estimated_chunks = total_chars // 800
+        if self.device != "cpu" or estimated_chunks <= self.parallel_threshold:
+            yield None
+            return
+        
+        pool = self._start_pool(worker_count())
+        try:
+            yield pool
+        finally:
+            pool.close()
+            pool.join()
+    
+    def _encode(self, texts: List[str], pool=None, batch_size: int = 64, shard_size: int = 512) -> np.ndarray:
+        """
+        Encode texts in process or across a worker pool.
+        
+        Texts are sorted by token count and encoded in windows of batch_size,
+        so every batch pads to a nearly uniform length. encode() on its own
+        only sorts by character count, which tracks token count loosely.
+        Results are permuted back to input order.
+        """
+        token_ids = self.embedding_model.tokenizer(texts, add_special_tokens=False, truncation=True)['input_ids']
+        order = np.argsort([len(ids) for ids in token_ids], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+        
+        if pool is not None:
+            # Shards are contiguous runs of the sorted texts, mapped in order,
+            # small enough that every worker gets one
+            shard_size = min(shard_size, max(batch_size, -(-len(sorted_texts) // worker_count())))
+            shards = [sorted_texts[i:i + shard_size] for i in range(0, len(sorted_texts), shard_size)]
+            sorted_embeddings = np.vstack(pool.starmap(encode_shard, zip(shards, repeat(batch_size))))
+        else:
+            sorted_embeddings = np.vstack([
+                self.embedding_model.encode(
+                    sorted_texts[i:i + batch_size],
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                for i in range(0, len(sorted_texts), batch_size)
+            ])
         
-        all_chunks = []
-        all_metadatas = []
-        all_ids = []
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+    
+    def _encode_unique(self, texts: List[str], pool=None) -> np.ndarray:
+        """
+        Encode texts, reusing cached embeddings for text seen before.
+        
+        Only the first occurrence of each unseen text is sent to the model;
+        duplicates share its embedding.
+        """
+        hashes = [_hash_chunk(text) for text in texts]
+        
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key in self._embedding_cache:
+                self._embedding_cache.move_to_end(key)
+            elif key not in missing:
+                missing[key] = text
+        
+        if missing:
+            for key, embedding in zip(missing, self._encode(list(missing.values()), pool)):
+                self._embedding_cache[key] = embedding
+        
+        embeddings = np.stack([self._embedding_cache[key] for key in hashes])
+        
+        while len(self._embedding_cache) > self.max_cached_embeddings:
+            self._embedding_cache.popitem(last=False)
+        
+        return embeddings
+    
+    def _flush(self, chunks: List[str], metadatas: List[Dict[str, Any]], ids: List[str], pool=None) -> None:
+        """Encode a buffer of chunks and add them to the collection."""
+        embeddings = self._encode_unique(chunks, pool)
+        
+        # Add to collection in large batches; upsert also makes re-adding
+        # a transcript replace its chunks instead of failing on duplicate ids
+        batch_size = min(1000, getattr(self.client, "max_batch_size", 1000))
+        for i in range(0, len(chunks), batch_size):
+            self.collection.upsert(
+                embeddings=embeddings[i:i+batch_size].tolist(),
+                documents=chunks[i:i+batch_size],
+                metadatas=metadatas[i:i+batch_size],
+                ids=ids[i:i+batch_size]
+            )
+        
+        if self.index is not None:
+            self.index.add(ids, embeddings)
+    
+    def _iter_chunk_batches(self, transcripts: List[Dict[str, Any]], flush_size: int):
+        """
+        Chunk transcripts lazily, yielding buffers of up to flush_size chunks.
+        
+        Yields:
+            (chunks, metadatas, ids) lists for one buffer
+        """
+        chunks_buffer = []
+        metadatas_buffer = []
+        ids_buffer = []
         
         for transcript in transcripts:
             title = transcript['title']
@@ -88,61 +399,235 @@ class VectorStore:
             chunks = self.chunk_text(content)
             
             for i, chunk in enumerate(chunks):
-                chunk_id = f"{title}_{i}"
-                
-                all_chunks.append(chunk)
-                all_metadatas.append({
+                chunks_buffer.append(chunk)
+                metadatas_buffer.append({
                     "title": title,
                     "chunk_index": i,
                     "total_chunks": len(chunks),
                     "word_count": len(chunk.split())
                 })
-                all_ids.append(chunk_id)
-        
-        # Add to collection in batches
-        batch_size = 100
-        for i in range(0, len(all_chunks), batch_size):
-            batch_chunks = all_chunks[i:i+batch_size]
-            batch_metadatas = all_metadatas[i:i+batch_size]
-            batch_ids = all_ids[i:i+batch_size]
-            
-            self.collection.add(
-                documents=batch_chunks,
-                metadatas=batch_metadatas,
-                ids=batch_ids
+                ids_buffer.append(f"{title}_{i}")
+                
+                if len(chunks_buffer) == flush_size:
+                    yield chunks_buffer, metadatas_buffer, ids_buffer
+                    chunks_buffer, metadatas_buffer, ids_buffer = [], [], []
+        
+        if chunks_buffer:
+            yield chunks_buffer, metadatas_buffer, ids_buffer
+    
+    def add_transcripts(self, transcripts: List[Dict[str, Any]], flush_size: int = 512, pool=None) -> None:
+        """
+        Add transcripts to the vector store.
+        
+        Chunks are encoded and added in buffers of flush_size as they are
+        produced, so only one buffer of chunk text and embeddings is held
+        in memory at a time.
+        
+        Args:
+            transcripts: List of transcript dictionaries
+            flush_size: Number of chunks encoded and added together
+            pool: Encoding pool from encoding_pool(); if None, one is started
+                for this call when the transcripts are large enough
+        """
+        print("Adding transcripts to vector store...")
+        
+        total = 0
+        with ExitStack() as stack:
+            if pool is None:
+                pool = stack.enter_context(self.encoding_pool(sum(len(t['content']) for t in transcripts)))
+            if pool is not None:
+                # Give each worker a full shard per flush
+                flush_size *= worker_count()
+            
+            for chunks, metadatas, ids in self._iter_chunk_batches(transcripts, flush_size):
+                self._flush(chunks, metadatas, ids, pool)
+                total += len(chunks)
+                print(f"Added {total} chunks")
+        
+        print(f"Successfully added {total} chunks to vector store")
+    
+    async def aadd_transcripts(self, transcripts: List[Dict[str, Any]], flush_size: int = 512,
+                               queue_size: int = 4, pool=None) -> None:
+        """
+        Add transcripts to the vector store without blocking the event loop.
+        
+        A producer chunks transcripts into buffers on a worker thread while
+        a consumer encodes and upserts the previous buffer on another, with
+        a bounded asyncio.Queue between them.
+        
+        Args:
+            transcripts: List of transcript dictionaries
+            flush_size: Number of chunks encoded and added together
+            queue_size: Maximum number of chunked buffers waiting to be encoded
+            pool: Encoding pool from encoding_pool(); if None, one is started
+                for this call when the transcripts are large enough
+        """
+        print("Adding transcripts to vector store...")
+        
+        with ExitStack() as stack:
+            if pool is None:
+                pool = stack.enter_context(self.encoding_pool(sum(len(t['content']) for t in transcripts)))
+            if pool is not None:
+                flush_size *= worker_count()
+            batches = asyncio.Queue(maxsize=queue_size)
+            
+            async def produce():
+                iterator = self._iter_chunk_batches(transcripts, flush_size)
+                try:
+                    while True:
+                        batch = await asyncio.to_thread(next, iterator, None)
+                        await batches.put(batch)
+                        if batch is None:
+                            return
+                except Exception:
+                    # Wake the consumer so the error is raised below instead of waited on
+                    await batches.put(None)
+                    raise
+            
+            async def consume():
+                total = 0
+                while True:
+                    batch = await batches.get()
+                    if batch is None:
+                        return total
+                    chunks, metadatas, ids = batch
+                    await asyncio.to_thread(self._flush, chunks, metadatas, ids, pool)
+                    total += len(chunks)
+                    print(f"Added {total} chunks")
+            
+            producer = asyncio.create_task(produce())
+            try:
+                total = await consume()
+                # Raises if chunking failed
+                await producer
+            finally:
+                # Otherwise a failed encode or a cancelled call would leave the
+                # producer blocked on the full queue
+                producer.cancel()
+        
+        print(f"Successfully added {total} chunks to vector store")
+    
+    def search(self, query: Union[str, List[str]], n_results: int = 5,
+               query_embedding: Optional[np.ndarray] = None) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """
+        Search for relevant chunks based on one or more queries.
+        
+        A list of queries is embedded in one batch and sent to Chroma in a
+        single query call.
+        
+        Args:
+            query: Search query, or a list of queries
+            n_results: Number of results to return per query
+            query_embedding: Precomputed normalized embedding of the query, or
+                one row per query when searching a list
+            
+        Returns:
+            List of relevant chunks with metadata, or one such list per query
+        """
+        single = isinstance(query, str)
+        queries = [query] if single else list(query)
+        
+        # Stored chunks are embedded with our own model, so queries must be too
+        if query_embedding is None and single:
+            query_embeddings = self.embed_query(query)[np.newaxis, :]
+        elif query_embedding is None:
+            query_embeddings = self.embedding_model.encode(queries, normalize_embeddings=True)
+        else:
+            query_embeddings = np.atleast_2d(query_embedding)
+        
+        # Stores built before the backend was enabled have an empty index
+        if self.index is not None and len(self.index):
+            all_results = [self._search_index(embedding, n_results) for embedding in query_embeddings]
+        else:
+            results = self.collection.query(
+                query_embeddings=query_embeddings.tolist(),
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
             )
             
-            print(f"Added batch {i//batch_size + 1}/{(len(all_chunks) + batch_size - 1)//batch_size}")
+            # Format results
+            all_results = [
+                [
+                    {'content': document, 'metadata': metadata, 'distance': distance}
+                    for document, metadata, distance in zip(documents, metadatas, distances)
+                ]
+                for documents, metadatas, distances in zip(
+                    results['documents'], results['metadatas'], results['distances']
+                )
+            ]
+        
+        return all_results[0] if single else all_results
+    
+    async def asearch(self, query: Union[str, List[str]], n_results: int = 5,
+                      query_embedding: Optional[np.ndarray] = None) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """
+        Search without blocking the event loop.
         
-        print(f"Successfully added {len(all_chunks)} chunks to vector store")
+        Args:
+            query: Search query, or a list of queries
+            n_results: Number of results to return per query
+            query_embedding: Precomputed normalized embedding(s) of the query
+            
+        Returns:
+            Same as search()
+        """
+        return await asyncio.to_thread(self.search, query, n_results, query_embedding)
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def _search_index(self, query_embedding: np.ndarray, n_results: int) -> List[Dict[str, Any]]:
         """
-        Search for relevant chunks based on query.
+        Shortlist chunks with the side index, then rerank them by cosine similarity.
+        
+        Chroma is only used here to fetch documents, metadata and full
+        precision embeddings by id.
         
         Args:
-            query: Search query
+            query_embedding: Normalized embedding of the query
             n_results: Number of results to return
             
         Returns:
             List of relevant chunks with metadata
         """
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            include=["documents", "metadatas", "distances"]
-        )
+        # Side indexes are append-only, so a re-added transcript leaves its
+        # chunk ids in them twice; over-fetch even for exact indexes so there
+        # are still n_results distinct ids after deduping, which Chroma's
+        # get() requires
+        shortlist_size = n_results * (self.rerank_factor if self.index.approximate else 2)
+        shortlist = self.index.search(query_embedding, shortlist_size)
+        shortlist = list(dict.fromkeys(shortlist))
+        results = self.collection.get(ids=shortlist, include=["embeddings", "documents", "metadatas"])
+        
+        # Stored embeddings are normalized, so the dot product is the cosine similarity
+        similarities = np.asarray(results['embeddings'], dtype=np.float32) @ query_embedding
+        order = np.argsort(-similarities)[:n_results]
         
-        # Format results
-        formatted_results = []
-        for i in range(len(results['documents'][0])):
-            formatted_results.append({
-                'content': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i]
-            })
+        return [
+            {
+                'content': results['documents'][i],
+                'metadata': results['metadatas'][i],
+                'distance': float(1 - similarities[i])
+            }
+            for i in order
+        ]
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Embed one normalized query with the embedding model."""
+        embedding = self.embedding_model.encode([query], normalize_embeddings=True)[0]
+        # The array is shared by every cache hit, so guard it against mutation
+        embedding.setflags(write=False)
+        return embedding
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query, reusing the embedding of a previously seen query.
         
-        return formatted_results
+        Args:
+            query: Query text
+            
+        Returns:
+            L2-normalized query embedding (read-only)
+        """
+        # The MiniLM tokenizer is uncased, so lowercasing doesn't change the embedding
+        return self._query_embedding_cache(query.strip().lower())
     
     def get_collection_info(self) -> Dict[str, Any]:
         """
@@ -159,11 +644,23 @@ class VectorStore:
             "persist_directory": self.persist_directory
         }
     
+    def close(self) -> None:
+        """
+        Save the side index's additions that are only held in memory.
+        
+        A trained FAISS index is updated in memory by each add, so it is
+        written once here at the end of an ingest. The store stays usable.
+        """
+        if self.index is not None:
+            self.index.save()
+    
     def clear_collection(self) -> None:
         """Clear all data from the collection."""
         self.client.delete_collection(name=self.collection.name)
         self.collection = self.client.create_collection(
             name="stanford_etl_transcripts",
-            metadata={"description": "Stanford ETL Transcripts Vector Database"}
+            metadata=COLLECTION_METADATA
         )
+        if self.index is not None:
+            self.index.clear()
         print("Collection cleared") 
\ No newline at end of file